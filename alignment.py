@@ -0,0 +1,79 @@
+# alignment.py
+"""Alineación de varias series (fecha, valor) sobre un calendario común, con arrays de numpy.
+
+Cada serie se ubica en el calendario con una búsqueda as-of hacia atrás (como
+pd.merge_asof): toma el valor de la última fecha <= a la del calendario, siempre que no
+esté a más de `tolerancia` días. Con tolerancia 0 es una coincidencia exacta de fechas; con
+más, los huecos de una fuente (feriados, fines de semana) se completan con su último dato.
+
+Las series que ya vienen ordenadas por fecha (range_cache, series_store) no se vuelven a
+ordenar: todo se resuelve con un searchsorted por serie, sin merges ni copias de DataFrames.
+"""
+
+import numpy as np
+import pandas as pd
+
+_UN_DIA = np.timedelta64(1, "D")
+
+
+def _preparar(fechas, valores) -> tuple[np.ndarray, np.ndarray]:
+    """Fechas datetime64[ns] ordenadas y valores float64, sin los NaN (para que el as-of
+    tome el último dato válido)."""
+    fechas = np.asarray(fechas, dtype="datetime64[ns]")
+    valores = np.asarray(valores, dtype=np.float64)
+    validos = ~(np.isnat(fechas) | np.isnan(valores))
+    if not validos.all():
+        fechas, valores = fechas[validos], valores[validos]
+    if len(fechas) > 1 and (fechas[1:] < fechas[:-1]).any():
+        orden = np.argsort(fechas, kind="stable")
+        fechas, valores = fechas[orden], valores[orden]
+    return fechas, valores
+
+
+def asof(calendario: np.ndarray, fechas: np.ndarray, valores: np.ndarray, tolerancia: int = 0) -> np.ndarray:
+    """Valores de la serie (fechas ordenadas) en cada fecha del calendario; NaN si no hay un
+    dato en los `tolerancia` días anteriores."""
+    if len(fechas) == 0:
+        return np.full(len(calendario), np.nan)
+    idx = np.searchsorted(fechas, calendario, side="right") - 1
+    hay = idx >= 0
+    idx[~hay] = 0
+    hay &= (calendario - fechas[idx]) <= tolerancia * _UN_DIA
+    return np.where(hay, valores[idx], np.nan)
+
+
+def alinear(series: dict, calendario=None, tolerancias: dict | None = None,
+            desde=None, hasta=None, requeridas=()) -> pd.DataFrame:
+    """DataFrame con 'fecha' y una columna por serie, alineadas sobre un calendario común.
+
+    - `series`: nombre -> (fechas, valores), en el orden de las columnas de salida.
+    - `calendario`: nombre de la serie cuyas fechas lo definen, o un array de fechas; por
+      defecto, la unión de las fechas de todas las series.
+    - `tolerancias`: nombre -> días hacia atrás que se acepta arrastrar un dato (default 0).
+    - `desde` / `hasta`: recorte del calendario (inclusivo).
+    - `requeridas`: se descartan las fechas sin dato en alguna de estas series.
+    """
+    tolerancias = tolerancias or {}
+    preparadas = {nombre: _preparar(f, v) for nombre, (f, v) in series.items()}
+
+    if calendario is None:
+        calendario = np.unique(np.concatenate([f for f, _ in preparadas.values()]))
+    elif isinstance(calendario, str):
+        calendario = preparadas[calendario][0]
+    else:
+        calendario = np.unique(np.asarray(calendario, dtype="datetime64[ns]"))
+    if desde is not None or hasta is not None:
+        i = np.searchsorted(calendario, np.datetime64(desde, "ns")) if desde is not None else 0
+        j = np.searchsorted(calendario, np.datetime64(hasta, "ns"), side="right") if hasta is not None else len(calendario)
+        calendario = calendario[i:j]
+
+    columnas = {
+        nombre: asof(calendario, f, v, tolerancias.get(nombre, 0))
+        for nombre, (f, v) in preparadas.items()
+    }
+    if requeridas:
+        completas = np.logical_and.reduce([~np.isnan(columnas[n]) for n in requeridas])
+        if not completas.all():
+            calendario = calendario[completas]
+            columnas = {n: c[completas] for n, c in columnas.items()}
+    return pd.DataFrame({"fecha": calendario, **columnas})
@@ -1,16 +1,14 @@
 # app.py
 
+import os
+import time
 import streamlit as st
 import datetime
 
-from data_fetching import (
-    get_inflacion, get_tasa_monetaria, get_reservas,
-    get_tipo_cambio, get_cny, get_merval, get_cedears
-)
-from plotting import (
-    plot_inflacion, plot_tasa_monetaria, plot_reservas,
-    plot_tipo_cambio, plot_cny, plot_merval, plot_cedears
-)
+_t_inicio = time.perf_counter()
+
+# Panel de debug con tiempos por fuente: ?debug=1 en la URL o MONITOR_DEBUG=1
+DEBUG = st.query_params.get("debug") == "1" or os.environ.get("MONITOR_DEBUG") == "1"
 
 # Configurar la página
 st.set_page_config(page_title="Monitor Financiero", layout="wide")
@@ -63,32 +61,96 @@ with col_fecha1:
 with col_fecha2:
     end_date = st.date_input("Hasta", value=datetime.date.today(), min_value=start_date, max_value=datetime.date.today(), key="end")
 
-
-# --- Cargar Datos ---
-with st.spinner('Descargando datos...'):
-    df_inflacion = get_inflacion(start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d"))
-    df_tasa = get_tasa_monetaria(start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d"))
-    df_reservas = get_reservas(start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d"))
-    df_tc = get_tipo_cambio(start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d"))
-    df_cny = get_cny(start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d"))
-    df_merval = get_merval(start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d"))
-    df_cedears = get_cedears(start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d"))
-
-# --- Layout ---
-col1, col2, col3 = st.columns(3)
-
-with col1:
-    st.plotly_chart(plot_inflacion(df_inflacion), use_container_width=True)
-    st.plotly_chart(plot_tasa_monetaria(df_tasa), use_container_width=True)
-
-with col2:
-    st.plotly_chart(plot_reservas(df_reservas), use_container_width=True)
-    st.plotly_chart(plot_tipo_cambio(df_tc), use_container_width=True)
-    st.plotly_chart(plot_cny(df_cny), use_container_width=True)
-
-with col3:
-    st.plotly_chart(plot_merval(df_merval), use_container_width=True)
-    st.plotly_chart(plot_cedears(df_cedears), use_container_width=True)
+_t_encabezado = time.perf_counter()
+
+# Los módulos de datos y gráficos se importan recién ahora, con el encabezado ya enviado
+# (ver startup.py para medir el costo de cada import)
+from data_fetching import FUENTES, TIMEOUTS_FUENTES
+from plotting import PANELES, COLUMNAS
+from fetch_orchestrator import en_orden_de_llegada
+import cache_backend
+import instrumentation
+import resilience
+
+_t_imports = time.perf_counter()
+
+# /metrics en formato Prometheus si está definido METRICAS_PUERTO
+instrumentation.iniciar_servidor_metricas()
+
+
+# --- Layout y carga de datos ---
+# Cada panel arranca con un aviso de "cargando" y se dibuja apenas llega su fuente:
+# todas se descargan en paralelo y una fuente lenta (Yahoo) no demora a las demás.
+TITULOS = {
+    "inflacion": "inflación",
+    "tasa": "tasa de política monetaria",
+    "reservas": "reservas",
+    "tipo_cambio": "tipo de cambio",
+    "cny": "yuan",
+    "merval": "Merval",
+    "cedears": "CEDEARs",
+}
+# Alto de cada gráfico en plotting (para que el aviso de carga ocupe el mismo lugar)
+ALTURAS = {"inflacion": 616, "cedears": 616}
+
+lugares = {}
+for col, nombres in zip(st.columns(len(COLUMNAS)), COLUMNAS):
+    with col:
+        for nombre in nombres:
+            lugares[nombre] = st.empty()
+            lugares[nombre].markdown(
+                f"<div class='panel-cargando' style='height:{ALTURAS.get(nombre, 300)}px'>"
+                f"Cargando {TITULOS[nombre]}…</div>",
+                unsafe_allow_html=True,
+            )
+
+
+def _aviso_desactualizado(res) -> str:
+    horas = [time.strftime("%H:%M", time.localtime(ts)) for ts in res.desactualizado.values() if ts]
+    desde = f" (último dato bueno: {min(horas)})" if horas else ""
+    return f"Datos desactualizados: {', '.join(res.desactualizado)} no responde{desde}."
+
+
+def mostrar_grafico(res):
+    lugar = lugares[res.nombre]
+    if res.ok:
+        with lugar.container():
+            st.plotly_chart(PANELES[res.nombre](res.df), use_container_width=True)
+            if res.desactualizado:
+                st.caption(f"⚠️ {_aviso_desactualizado(res)}")
+    else:
+        lugar.warning(f"No se pudieron cargar los datos de '{res.nombre}': {res.error or 'sin datos'}")
+
+
+resultados = {}
+for res in en_orden_de_llegada(
+    FUENTES, start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d"), TIMEOUTS_FUENTES
+):
+    resultados[res.nombre] = res
+    mostrar_grafico(res)
+
+
+if DEBUG:
+    # pandas solo hace falta para las tablas de debug (streamlit no lo importa por su cuenta)
+    import pandas as pd
+
+    with st.sidebar:
+        st.subheader("Debug: tiempos por fuente")
+        st.caption("Tiempo de esta corrida por fuente")
+        st.dataframe(
+            pd.DataFrame([{"fuente": r.nombre, "ms": round(r.segundos * 1000), "error": r.error} for r in resultados.values()]),
+            hide_index=True,
+        )
+        st.caption(
+            f"Arranque: encabezado {(_t_encabezado - _t_inicio) * 1000:.0f} ms, "
+            f"imports de datos y gráficos {(_t_imports - _t_encabezado) * 1000:.0f} ms"
+        )
+        st.caption("Acumulado del proceso (get_* y plot_*)")
+        st.dataframe(pd.DataFrame(instrumentation.resumen()), hide_index=True)
+        st.caption("Interruptores por host")
+        st.dataframe(pd.DataFrame(resilience.estado()), hide_index=True)
+        st.caption(f"Cache compartido: {cache_backend.descripcion()}")
+        st.dataframe(pd.DataFrame(cache_backend.estadisticas()), hide_index=True)
 
 
 # Footer
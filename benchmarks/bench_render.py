@@ -0,0 +1,197 @@
+# benchmarks/bench_render.py
+"""Benchmarks de las etapas de un render del dashboard (sin red).
+
+Mide, para rangos de 1, 5 y 20 años:
+  - JSON -> DataFrame de get_bcra_variable (desde dicts y desde los bytes de la respuesta)
+  - aplanado de 'detalle' de get_usd_oficial / get_cny_oficial
+  - parseo de evolution.json de get_usd_blue (desde la lista y desde los bytes)
+  - merges de get_tipo_cambio / get_merval
+  - rebase de get_cedears
+  - cada plotting.plot_*
+
+Uso:
+    python benchmarks/bench_render.py                        # datos sintéticos
+    python benchmarks/bench_render.py --fixtures fixtures    # datos grabados con replay_server.py
+    python benchmarks/bench_render.py --salida base.json
+    python benchmarks/bench_render.py --comparar base.json   # compara contra otra corrida
+
+Los resultados se guardan en JSON junto con el commit, para comparar entre commits.
+"""
+
+import os
+import sys
+import json
+import time
+import timeit
+import argparse
+import tempfile
+import platform
+import statistics
+import subprocess
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import pandas as pd
+
+import data_fetching as dfx
+import decoding
+import plotting
+import replay_server
+
+RANGOS = {"1a": 1, "5a": 5, "20a": 20}
+
+
+def _commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except Exception:
+        return "desconocido"
+
+
+def _leer(directorio, nombre):
+    with open(os.path.join(directorio, nombre), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _closes_yahoo(directorio, tickers, start, end) -> pd.DataFrame:
+    """Cierres con la misma forma que devuelve market_data.cierres (fecha + una columna por ticker)."""
+    series = {}
+    for t in tickers:
+        data = _leer(directorio, os.path.basename(replay_server._archivo_yahoo(directorio, t)))
+        series[t] = pd.Series({f: v for f, v in data if start <= f <= end}, dtype=float)
+    df = pd.DataFrame(series)
+    df.index = pd.to_datetime(df.index)
+    return df.sort_index().rename_axis("fecha").reset_index()
+
+
+def _sin_cache(plot_fn, df):
+    # mide la construcción completa de la figura, no un acierto del cache de figuras
+    plotting.limpiar_cache_figuras()
+    return plot_fn(df.copy())
+
+
+def preparar_casos(directorio: str, anios: int) -> dict:
+    """Arma las entradas de cada etapa para un rango de `anios` años y devuelve {etapa: función}."""
+    monetarias = {i: _leer(directorio, f"bcra_monetarias_{i}.json") for i in (1, 27, 160)}
+    hasta = max(x["fecha"] for x in monetarias[1])
+    desde = (pd.Timestamp(hasta) - pd.DateOffset(years=anios)).strftime("%Y-%m-%d")
+
+    def _paginas(id_variable):
+        filas = [x for x in monetarias[id_variable] if desde <= x["fecha"] <= hasta]
+        lim = dfx.BCRA_PAGE_LIMIT
+        return [{"results": filas[i:i + lim]} for i in range(0, max(len(filas), 1), lim)]
+
+    paginas_reservas = _paginas(1)
+    cot_usd = [x for x in _leer(directorio, "cotizaciones_USD.json") if desde <= x["fecha"] <= hasta]
+    cot_cny = [x for x in _leer(directorio, "cotizaciones_CNY.json") if desde <= x["fecha"] <= hasta]
+    evolution = _leer(directorio, "bluelytics_evolution.json")
+    with open(os.path.join(directorio, "bluelytics_evolution.json"), "rb") as f:
+        evolution_bytes = f.read()
+    paginas_reservas_bytes = [json.dumps(p).encode("utf-8") for p in paginas_reservas]
+    merval_raw = _closes_yahoo(directorio, ["^MERV"], desde, hasta)
+    cedears_raw = _closes_yahoo(directorio, list(dfx.CEDEARS), desde, hasta)
+
+    # Entradas de los gráficos, armadas con las mismas funciones que usa la app
+    def _bcra(id_variable):
+        return dfx._df_bcra([dfx._columnas_bcra(p) for p in _paginas(id_variable)], id_variable)
+
+    df_usd_oficial = dfx._aplanar_cotizaciones(cot_usd, "usd_oficial")
+    df_blue = dfx._df_usd_blue(evolution)
+    df_inflacion, df_tasa, df_reservas = _bcra(27), _bcra(160), _bcra(1)
+    df_tc = dfx._combinar_tipo_cambio(df_usd_oficial, df_blue, desde, hasta)
+    df_cny = dfx._aplanar_cotizaciones(cot_cny, "cny_oficial")
+    df_merval = dfx._combinar_merval(merval_raw, df_blue, desde, hasta)
+    df_cedears = dfx._rebasar_cedears(cedears_raw.copy())
+
+    return {
+        "bcra_json_a_df": lambda: dfx._df_bcra([dfx._columnas_bcra(p) for p in paginas_reservas], 1),
+        "bcra_bytes_a_df": lambda: dfx._df_bcra(
+            [dfx._columnas_bcra(decoding.cargar_json(p)) for p in paginas_reservas_bytes], 1
+        ),
+        "usd_oficial_aplanar": lambda: dfx._aplanar_cotizaciones(cot_usd, "usd_oficial"),
+        "cny_oficial_aplanar": lambda: dfx._aplanar_cotizaciones(cot_cny, "cny_oficial"),
+        "usd_blue_parseo": lambda: dfx._df_usd_blue(evolution),
+        "usd_blue_bytes": lambda: dfx._df_usd_blue(evolution_bytes),
+        "tipo_cambio_merge": lambda: dfx._combinar_tipo_cambio(df_usd_oficial, df_blue, desde, hasta),
+        "merval_merge": lambda: dfx._combinar_merval(merval_raw, df_blue, desde, hasta),
+        "cedears_rebase": lambda: dfx._rebasar_cedears(cedears_raw.copy()),
+        "plot_inflacion": lambda: _sin_cache(plotting.plot_inflacion, df_inflacion),
+        "plot_tasa_monetaria": lambda: _sin_cache(plotting.plot_tasa_monetaria, df_tasa),
+        "plot_reservas": lambda: _sin_cache(plotting.plot_reservas, df_reservas),
+        "plot_tipo_cambio": lambda: _sin_cache(plotting.plot_tipo_cambio, df_tc),
+        "plot_cny": lambda: _sin_cache(plotting.plot_cny, df_cny),
+        "plot_merval": lambda: _sin_cache(plotting.plot_merval, df_merval),
+        "plot_cedears": lambda: _sin_cache(plotting.plot_cedears, df_cedears),
+    }
+
+
+def medir(fn, repeticiones: int) -> dict:
+    timer = timeit.Timer(fn)
+    numero, _ = timer.autorange()
+    tiempos = [t / numero for t in timer.repeat(repeat=repeticiones, number=numero)]
+    return {"mediana": statistics.median(tiempos), "min": min(tiempos), "n": numero}
+
+
+def correr(directorio: str, repeticiones: int, filtro: str | None) -> dict:
+    resultados = {}
+    for etiqueta, anios in RANGOS.items():
+        for etapa, fn in preparar_casos(directorio, anios).items():
+            if filtro and filtro not in etapa:
+                continue
+            clave = f"{etapa}@{etiqueta}"
+            resultados[clave] = medir(fn, repeticiones)
+            print(f"{clave:<32} {resultados[clave]['mediana'] * 1000:10.3f} ms")
+    return resultados
+
+
+def comparar(actual: dict, base: dict) -> None:
+    print(f"\n{'etapa':<32} {'base ms':>10} {'actual ms':>10} {'ratio':>7}   ({base['commit']} -> {actual['commit']})")
+    for clave, r in actual["resultados"].items():
+        b = base["resultados"].get(clave)
+        if b is None:
+            continue
+        ratio = r["mediana"] / b["mediana"]
+        marca = "  <-- más lento" if ratio > 1.1 else ("  más rápido" if ratio < 0.9 else "")
+        print(f"{clave:<32} {b['mediana'] * 1000:10.3f} {r['mediana'] * 1000:10.3f} {ratio:7.2f}{marca}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", help="directorio con fixtures grabados (default: sintéticos)")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--filtro", help="solo etapas que contengan este texto")
+    parser.add_argument("--salida", help="archivo JSON donde guardar los resultados")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior para comparar")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directorio = args.fixtures
+        if directorio is None:
+            directorio = tmp
+            hasta = pd.Timestamp.today().normalize()
+            replay_server.generar_sinteticos(
+                directorio, (hasta - pd.DateOffset(years=21)).strftime("%Y-%m-%d"), hasta.strftime("%Y-%m-%d")
+            )
+        resultados = correr(directorio, args.repeticiones, args.filtro)
+
+    corrida = {
+        "commit": _commit(),
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "datos": "grabados" if args.fixtures else "sinteticos",
+        "resultados": resultados,
+    }
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(corrida, f, indent=2)
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            comparar(corrida, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
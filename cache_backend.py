@@ -0,0 +1,468 @@
+# cache_backend.py
+"""Cache compartido de resultados de get_*, con almacenamiento intercambiable.
+
+range_cache y single_flight viven en la memoria de cada proceso; con varias réplicas del
+tablero detrás de un balanceador cada una vuelve a pedir lo mismo a las APIs. Este cache
+va entre la memoria del proceso y la API: cuando a range_cache / single_flight les falta
+un rango, se busca primero acá. El backend se elige con MONITOR_CACHE_BACKEND:
+
+    ninguno                 desactivado (default)
+    memoria                 LRU en el proceso, con TTL (para pruebas: duplica lo que ya
+                            guarda range_cache, fuera de su presupuesto de memoria)
+    disco                   SQLite en CACHE_DIR/compartido.sqlite (réplicas en la misma máquina)
+    redis://host:puerto/db  cualquier servidor que hable el protocolo de Redis (RESP)
+    rediss://host:puerto/db el mismo, sobre TLS
+
+Para probar sin Redis hay un servidor mínimo compatible en este mismo módulo:
+
+    python cache_backend.py servir --puerto 6379
+    MONITOR_CACHE_BACKEND=redis://localhost:6379 streamlit run app.py
+
+Las claves se normalizan por fuente y rango ("monitor:v1:get_merval:2024-11-11:2025-06-30"),
+el TTL sale de la política de refresher para la fuente, y los aciertos / fallos por
+fuente se ven en estadisticas() (panel de debug) y en /metrics.
+
+Los DataFrames se guardan como arrays de numpy (.npz, sin pickle): leer del backend nunca
+ejecuta código, aunque el Redis sea compartido.
+"""
+
+import io
+import os
+import ssl
+import sys
+import time
+import socket
+import sqlite3
+import logging
+import argparse
+import threading
+import socketserver
+from collections import OrderedDict
+from functools import wraps
+from urllib.parse import urlparse
+
+import numpy as np
+import pandas as pd
+
+import instrumentation
+import refresher
+import resilience
+import series_store
+
+logger = logging.getLogger("monitor")
+
+# Sin backend compartido configurado no hay nada que compartir: con una sola réplica
+# range_cache ya cubre la memoria del proceso
+BACKEND = os.environ.get("MONITOR_CACHE_BACKEND", "ninguno")
+
+# Tope del backend en memoria (bytes serializados)
+MEMORIA_BYTES = int(os.environ.get("MONITOR_CACHE_COMPARTIDO_MB", 64)) * 1024 * 1024
+
+# Se sube al cambiar el formato de las claves o de los datos guardados. Con las APIs
+# redirigidas (replay) las claves llevan además el origen: no se mezclan con las reales.
+PREFIJO = "monitor:v1" + (f":{series_store.ORIGEN}" if series_store.ORIGEN else "")
+
+
+# --- Serialización ---
+
+def a_bytes(df: pd.DataFrame) -> bytes:
+    """DataFrame (índice por defecto, columnas numéricas / fechas / texto) a .npz."""
+    arrays = {"__columnas__": np.array([str(c) for c in df.columns])}
+    for i, col in enumerate(df.columns):
+        valores = df[col].to_numpy()
+        if valores.dtype == object:
+            valores = valores.astype(str)
+        arrays[f"c{i}"] = valores
+    buffer = io.BytesIO()
+    np.savez(buffer, **arrays)
+    return buffer.getvalue()
+
+
+def desde_bytes(datos: bytes) -> pd.DataFrame:
+    with np.load(io.BytesIO(datos), allow_pickle=False) as npz:
+        columnas = list(npz["__columnas__"])
+        return pd.DataFrame({c: npz[f"c{i}"] for i, c in enumerate(columnas)}, columns=columnas)
+
+
+def clave(nombre: str, *args) -> str:
+    """Clave normalizada: las fechas (date, datetime, Timestamp o texto) quedan como YYYY-MM-DD."""
+    partes = []
+    for a in args:
+        if hasattr(a, "strftime"):
+            a = a.strftime("%Y-%m-%d")
+        partes.append(str(a))
+    return ":".join([PREFIJO, nombre, *partes])
+
+
+# --- Backends: get(clave) -> bytes | None, set(clave, bytes, ttl) ---
+
+class MemoriaLRU:
+    """LRU en el proceso con vencimiento por entrada y tope de bytes."""
+
+    def __init__(self, max_bytes: int = MEMORIA_BYTES):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._datos = OrderedDict()   # clave -> (vence, bytes)
+        self._total = 0
+
+    def get(self, clave: str) -> bytes | None:
+        with self._lock:
+            hit = self._datos.get(clave)
+            if hit is None:
+                return None
+            if hit[0] <= time.time():
+                self._total -= len(self._datos.pop(clave)[1])
+                return None
+            self._datos.move_to_end(clave)
+            return hit[1]
+
+    def set(self, clave: str, valor: bytes, ttl: float) -> None:
+        if len(valor) > self.max_bytes:
+            return
+        with self._lock:
+            viejo = self._datos.pop(clave, None)
+            if viejo is not None:
+                self._total -= len(viejo[1])
+            self._datos[clave] = (time.time() + ttl, valor)
+            self._total += len(valor)
+            while self._total > self.max_bytes:
+                _, (_, descartado) = self._datos.popitem(last=False)
+                self._total -= len(descartado)
+
+    def descripcion(self) -> str:
+        return f"memoria ({self._total / 1024 / 1024:.1f} de {self.max_bytes / 1024 / 1024:.0f} MB)"
+
+
+class Disco:
+    """Tabla clave / vencimiento / datos en SQLite, compartida por los procesos de la máquina."""
+
+    def __init__(self, ruta: str | None = None):
+        self.ruta = ruta or os.path.join(series_store.CACHE_DIR, "compartido.sqlite")
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.ruta) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.ruta, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS cache (clave TEXT PRIMARY KEY, vence REAL, datos BLOB)")
+            self._local.conn = conn
+        return conn
+
+    def get(self, clave: str) -> bytes | None:
+        fila = self._conn().execute(
+            "SELECT datos FROM cache WHERE clave = ? AND vence > ?", (clave, time.time())
+        ).fetchone()
+        return fila[0] if fila else None
+
+    def set(self, clave: str, valor: bytes, ttl: float) -> None:
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM cache WHERE vence <= ?", (time.time(),))
+            conn.execute("INSERT OR REPLACE INTO cache VALUES (?, ?, ?)", (clave, time.time() + ttl, valor))
+
+    def descripcion(self) -> str:
+        return f"disco ({self.ruta})"
+
+
+class _ErrorRedis(Exception):
+    pass
+
+
+class Redis:
+    """Cliente RESP mínimo (GET / SET con PX), una conexión por hilo.
+
+    Usa el interruptor de resilience del servidor: si no responde, las llamadas cuentan
+    como fallos de cache y los get_* van directo a la fuente.
+    """
+
+    def __init__(self, url: str, timeout: float = 2.0):
+        u = urlparse(url)
+        self.host = u.hostname or "localhost"
+        self.puerto = u.port or 6379
+        self.db = int(u.path.strip("/") or 0)
+        self.password = u.password
+        self.tls = u.scheme == "rediss"
+        self.timeout = timeout
+        self.nombre = f"{self.host}:{self.puerto}"
+        self._local = threading.local()
+
+    def _conectar(self):
+        sock = socket.create_connection((self.host, self.puerto), timeout=self.timeout)
+        if self.tls:
+            sock = ssl.create_default_context().wrap_socket(sock, server_hostname=self.host)
+        lector = sock.makefile("rb")
+        self._local.sock, self._local.lector = sock, lector
+        if self.password:
+            self._enviar("AUTH", self.password)
+        if self.db:
+            self._enviar("SELECT", self.db)
+
+    def _leer(self):
+        linea = self._local.lector.readline()
+        if not linea:
+            raise ConnectionError("conexión cerrada por el servidor")
+        tipo, resto = linea[:1], linea[1:-2]
+        if tipo == b"+":
+            return resto.decode()
+        if tipo == b"-":
+            raise _ErrorRedis(resto.decode())
+        if tipo == b":":
+            return int(resto)
+        if tipo == b"$":
+            largo = int(resto)
+            if largo < 0:
+                return None
+            datos = self._local.lector.read(largo + 2)
+            return datos[:-2]
+        if tipo == b"*":
+            return [self._leer() for _ in range(int(resto))]
+        raise ConnectionError(f"respuesta RESP inválida: {linea[:20]!r}")
+
+    def _enviar(self, *partes):
+        mensaje = [f"*{len(partes)}\r\n".encode()]
+        for p in partes:
+            p = p if isinstance(p, bytes) else str(p).encode()
+            mensaje += [f"${len(p)}\r\n".encode(), p, b"\r\n"]
+        self._local.sock.sendall(b"".join(mensaje))
+        return self._leer()
+
+    def comando(self, *partes):
+        inter = resilience.interruptor(self.nombre)
+        inter.permitir()
+        try:
+            if getattr(self._local, "sock", None) is None:
+                self._conectar()
+            respuesta = self._enviar(*partes)
+        except _ErrorRedis:
+            inter.soltar()
+            raise
+        except Exception:
+            self._cerrar()
+            inter.fallo()
+            raise
+        inter.exito()
+        return respuesta
+
+    def _cerrar(self):
+        sock = getattr(self._local, "sock", None)
+        self._local.sock = None
+        if sock is not None:
+            sock.close()
+
+    def get(self, clave: str) -> bytes | None:
+        return self.comando("GET", clave)
+
+    def set(self, clave: str, valor: bytes, ttl: float) -> None:
+        self.comando("SET", clave, valor, "PX", int(ttl * 1000))
+
+    def descripcion(self) -> str:
+        return f"{'rediss' if self.tls else 'redis'} ({self.nombre}/{self.db})"
+
+
+def crear_backend(config: str = BACKEND):
+    if config == "memoria":
+        return MemoriaLRU()
+    if config == "disco":
+        return Disco()
+    if config.startswith(("redis://", "rediss://")):
+        return Redis(config)
+    if config in ("", "ninguno"):
+        return None
+    raise ValueError(f"MONITOR_CACHE_BACKEND desconocido: {config!r}")
+
+
+_backend = crear_backend()
+
+
+def usar_backend(backend) -> None:
+    """Cambia el backend en uso (scripts y pruebas); None desactiva el cache compartido."""
+    global _backend
+    _backend = backend
+
+
+# --- Decorador y estadísticas ---
+
+_stats_lock = threading.Lock()
+_stats = {}   # nombre de la función -> {"hits", "misses", "errores"}
+
+
+def _contar(nombre: str, campo: str) -> None:
+    with _stats_lock:
+        t = _stats.setdefault(nombre, {"hits": 0, "misses": 0, "errores": 0})
+        t[campo] += 1
+
+
+def compartido(fuente):
+    """Decorador: guarda el resultado de la función en el backend compartido.
+
+    `fuente` da el TTL (refresher.frescura); como en cache_por_rango puede ser un texto o
+    una función de los argumentos previos al rango. Los resultados vacíos o marcados
+    como desactualizados (resilience) no se guardan. Un backend caído no rompe nada: se
+    cuenta el error y se llama a la función.
+    """
+    def decorador(fn):
+        nombre = fn.__name__
+
+        @wraps(fn)
+        def wrapper(*args):
+            backend = _backend
+            if backend is None:
+                return fn(*args)
+            k = clave(nombre, *args)
+            try:
+                datos = backend.get(k)
+            except Exception as e:
+                logger.debug(f"cache compartido: no se pudo leer {k}: {e}")
+                _contar(nombre, "errores")
+                datos = None
+            if datos is not None:
+                _contar(nombre, "hits")
+                instrumentation.marcar_cache(hit=True)
+                return desde_bytes(datos)
+
+            _contar(nombre, "misses")
+            instrumentation.marcar_cache(hit=False)
+            with resilience.registro() as marcas:
+                df = fn(*args)
+            if df is None or df.empty or marcas:
+                return df
+            politica = fuente(*args[:-2]) if callable(fuente) else fuente
+            try:
+                backend.set(k, a_bytes(df), refresher.frescura(politica))
+            except Exception as e:
+                logger.debug(f"cache compartido: no se pudo guardar {k}: {e}")
+                _contar(nombre, "errores")
+            return df
+        return wrapper
+    return decorador
+
+
+def estadisticas() -> list[dict]:
+    """Una fila por función con aciertos, fallos y tasa de aciertos del cache compartido."""
+    with _stats_lock:
+        filas = [dict(fuente=n, **t) for n, t in sorted(_stats.items())]
+    for f in filas:
+        consultas = f["hits"] + f["misses"]
+        f["hit_ratio"] = round(f["hits"] / consultas, 3) if consultas else None
+    return filas
+
+
+def descripcion() -> str:
+    return _backend.descripcion() if _backend is not None else "ninguno"
+
+
+def _lineas_prometheus() -> list[str]:
+    lineas = [
+        "# HELP monitor_cache_compartido_total Consultas al cache compartido por resultado.",
+        "# TYPE monitor_cache_compartido_total counter",
+    ]
+    for f in estadisticas():
+        for resultado in ("hits", "misses", "errores"):
+            lineas.append(f'monitor_cache_compartido_total{{fuente="{f["fuente"]}",resultado="{resultado}"}} {f[resultado]}')
+    return lineas
+
+
+instrumentation.registrar_metricas(_lineas_prometheus)
+
+
+# --- Servidor local compatible con Redis (para desarrollo y pruebas) ---
+
+class _ManejadorRESP(socketserver.StreamRequestHandler):
+    """Atiende PING, GET, SET (EX / PX), DEL, EXISTS, DBSIZE, FLUSHALL, SELECT y AUTH."""
+
+    def _leer_comando(self):
+        linea = self.rfile.readline()
+        if not linea:
+            return None
+        if not linea.startswith(b"*"):   # comando en línea (redis-cli / telnet)
+            return linea.split()
+        partes = []
+        for _ in range(int(linea[1:-2])):
+            largo = int(self.rfile.readline()[1:-2])
+            partes.append(self.rfile.read(largo + 2)[:-2])
+        return partes
+
+    def _responder(self, valor):
+        if valor is None:
+            self.wfile.write(b"$-1\r\n")
+        elif isinstance(valor, int):
+            self.wfile.write(b":%d\r\n" % valor)
+        elif isinstance(valor, bytes):
+            self.wfile.write(b"$%d\r\n%s\r\n" % (len(valor), valor))
+        elif valor.startswith("ERR"):
+            self.wfile.write(f"-{valor}\r\n".encode())
+        else:
+            self.wfile.write(f"+{valor}\r\n".encode())
+
+    def handle(self):
+        datos, lock = self.server.datos, self.server.lock
+        while (partes := self._leer_comando()) is not None:
+            if not partes:
+                continue
+            cmd, args = partes[0].upper(), partes[1:]
+            with lock:
+                if cmd == b"PING":
+                    respuesta = "PONG"
+                elif cmd == b"GET":
+                    hit = datos.get(args[0])
+                    if hit is not None and hit[0] is not None and hit[0] <= time.time():
+                        del datos[args[0]]
+                        hit = None
+                    respuesta = hit[1] if hit else None
+                elif cmd == b"SET":
+                    vence = None
+                    opciones = [a.upper() for a in args[2:]]
+                    if b"PX" in opciones:
+                        vence = time.time() + int(args[2 + opciones.index(b"PX") + 1]) / 1000
+                    elif b"EX" in opciones:
+                        vence = time.time() + int(args[2 + opciones.index(b"EX") + 1])
+                    datos[args[0]] = (vence, args[1])
+                    respuesta = "OK"
+                elif cmd == b"DEL":
+                    respuesta = sum(datos.pop(a, None) is not None for a in args)
+                elif cmd == b"EXISTS":
+                    respuesta = sum(a in datos for a in args)
+                elif cmd == b"DBSIZE":
+                    respuesta = len(datos)
+                elif cmd == b"FLUSHALL":
+                    datos.clear()
+                    respuesta = "OK"
+                elif cmd in (b"SELECT", b"AUTH"):
+                    respuesta = "OK"
+                else:
+                    respuesta = f"ERR comando no soportado '{cmd.decode(errors='replace')}'"
+            self._responder(respuesta)
+            self.wfile.flush()
+
+
+class ServidorRESP(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, direccion):
+        super().__init__(direccion, _ManejadorRESP)
+        self.datos = {}   # clave -> (vence o None, valor)
+        self.lock = threading.Lock()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p_servir = sub.add_parser("servir", help="servidor local compatible con Redis")
+    p_servir.add_argument("--host", default="127.0.0.1")
+    p_servir.add_argument("--puerto", type=int, default=6379)
+    args = parser.parse_args()
+
+    servidor = ServidorRESP((args.host, args.puerto))
+    print(f"Cache compartido en redis://{args.host}:{args.puerto}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
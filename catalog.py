@@ -0,0 +1,199 @@
+# catalog.py
+"""Catálogo de variables monetarias del BCRA (/monetarias) con búsqueda por descripción.
+
+- El listado se guarda en disco (MONITOR_CACHE_DIR/catalogo_monetarias.json) y se
+  reutiliza mientras esté fresco (política "catalogo" de refresher); vencido, se sigue
+  usando y se actualiza en segundo plano.
+- Las descripciones se normalizan (sin acentos, minúsculas) y se indexan por token, así
+  una búsqueda no recorre el catálogo entero: busca cada token de la consulta en el
+  índice (exacto, por prefijo o, si no hay, aproximado).
+"""
+
+import os
+import re
+import json
+import time
+import bisect
+import difflib
+import threading
+import unicodedata
+
+import refresher
+import series_store
+
+CATALOGO_PATH = os.path.join(series_store.CACHE_DIR, "catalogo_monetarias.json")
+
+# Palabras que no aportan a la búsqueda
+STOPWORDS = {"a", "al", "con", "de", "del", "el", "en", "la", "las", "los", "para", "por", "y", "e", "o", "u"}
+
+# Peso de cada tipo de coincidencia de un token de la consulta
+PESO_EXACTO = 1.0
+PESO_PREFIJO = 0.8
+PESO_APROXIMADO = 0.6
+# Similitud mínima (difflib) para aceptar un token aproximado
+SIMILITUD_MINIMA = 0.8
+# Largo mínimo de un token de la consulta para buscarlo por prefijo
+LARGO_PREFIJO = 3
+# Consultas cuyo resultado se recuerda (el catálogo en memoria no cambia)
+MAX_CONSULTAS_MEMO = 1024
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def normalizar(texto: str) -> str:
+    """Sin acentos y en minúsculas ("Política" -> "politica")."""
+    texto = unicodedata.normalize("NFKD", str(texto))
+    return texto.encode("ascii", errors="ignore").decode("ascii").lower()
+
+
+def tokens(texto: str) -> list[str]:
+    return [t for t in _TOKEN.findall(normalizar(texto)) if t not in STOPWORDS]
+
+
+class Catalogo:
+    """Índice invertido token -> variables sobre las descripciones del catálogo."""
+
+    def __init__(self, variables: list[dict]):
+        self.variables = [v for v in variables if v.get("idVariable") is not None]
+        self._por_id = {int(v["idVariable"]): v for v in self.variables}
+        self._indice = {}   # token -> set de posiciones en self.variables
+        for i, v in enumerate(self.variables):
+            for t in tokens(v.get("descripcion", "")):
+                self._indice.setdefault(t, set()).add(i)
+        self._vocabulario = sorted(self._indice)
+        self._expansiones = {}   # token de consulta -> [(token del índice, peso)]
+        self._resultados = {}    # (tokens de la consulta, n) -> resultados de buscar()
+
+    def __len__(self) -> int:
+        return len(self.variables)
+
+    def descripcion(self, id_variable: int) -> str | None:
+        v = self._por_id.get(int(id_variable))
+        return v.get("descripcion") if v else None
+
+    def _expandir(self, token: str) -> list[tuple[str, float]]:
+        """Tokens del índice que coinciden con `token` y con qué peso (memoizado)."""
+        if token in self._expansiones:
+            return self._expansiones[token]
+        encontrados = []
+        if token in self._indice:
+            encontrados.append((token, PESO_EXACTO))
+        if len(token) >= LARGO_PREFIJO:
+            i = bisect.bisect_left(self._vocabulario, token)
+            while i < len(self._vocabulario) and self._vocabulario[i].startswith(token):
+                if self._vocabulario[i] != token:
+                    encontrados.append((self._vocabulario[i], PESO_PREFIJO))
+                i += 1
+        if not encontrados:
+            encontrados = [
+                (t, PESO_APROXIMADO)
+                for t in difflib.get_close_matches(token, self._vocabulario, n=3, cutoff=SIMILITUD_MINIMA)
+            ]
+        self._expansiones[token] = encontrados
+        return encontrados
+
+    def buscar(self, consulta: str, n: int = 5) -> list[dict]:
+        """Las `n` variables que mejor coinciden con `consulta`, de mejor a peor.
+
+        Cada resultado trae idVariable, descripcion y puntaje (0 a 1: fracción de los tokens
+        de la consulta encontrados, ponderada por el tipo de coincidencia). A igual puntaje
+        gana la descripción más corta (la serie más "obvia").
+        """
+        consulta = tuple(tokens(consulta))
+        if not consulta:
+            return []
+        if (consulta, n) in self._resultados:
+            return self._resultados[(consulta, n)]
+        puntajes = {}
+        for token in consulta:
+            mejor = {}
+            for t, peso in self._expandir(token):
+                for i in self._indice[t]:
+                    if peso > mejor.get(i, 0.0):
+                        mejor[i] = peso
+            for i, peso in mejor.items():
+                puntajes[i] = puntajes.get(i, 0.0) + peso
+        orden = sorted(
+            puntajes.items(),
+            key=lambda x: (-x[1], len(self.variables[x[0]].get("descripcion", ""))),
+        )
+        resultados = [
+            {
+                "idVariable": int(self.variables[i]["idVariable"]),
+                "descripcion": self.variables[i].get("descripcion"),
+                "puntaje": round(p / len(consulta), 3),
+            }
+            for i, p in orden[:n]
+        ]
+        if len(self._resultados) < MAX_CONSULTAS_MEMO:
+            self._resultados[(consulta, n)] = resultados
+        return resultados
+
+    def id_por_descripcion(self, consulta: str, puntaje_minimo: float = 0.5) -> int | None:
+        """idVariable de la mejor coincidencia, o None si ninguna llega a `puntaje_minimo`."""
+        resultados = self.buscar(consulta, n=1)
+        if not resultados or resultados[0]["puntaje"] < puntaje_minimo:
+            return None
+        return resultados[0]["idVariable"]
+
+
+# --- Persistencia y frescura ---
+
+_lock = threading.Lock()
+_actual = None      # Catalogo en memoria
+_descargado = 0.0   # time.time() de la descarga del catálogo en memoria
+
+
+def _leer_disco():
+    try:
+        with open(CATALOGO_PATH, encoding="utf-8") as f:
+            data = json.load(f)
+        return data["descargado"], data["results"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _guardar_disco(variables: list[dict]) -> float:
+    ahora = time.time()
+    os.makedirs(os.path.dirname(CATALOGO_PATH) or ".", exist_ok=True)
+    tmp = CATALOGO_PATH + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"descargado": ahora, "results": variables}, f, ensure_ascii=False)
+    os.replace(tmp, CATALOGO_PATH)
+    return ahora
+
+
+def _actualizar(descargar) -> None:
+    global _actual, _descargado
+    variables = descargar()
+    if not variables:
+        return
+    descargado = _guardar_disco(variables)
+    catalogo = Catalogo(variables)
+    with _lock:
+        _actual, _descargado = catalogo, descargado
+
+
+def obtener(descargar) -> Catalogo:
+    """Catálogo vigente. `descargar()` devuelve la lista 'results' de /monetarias.
+
+    Solo se descarga de forma sincrónica si no hay copia en memoria ni en disco; una copia
+    vencida se sigue sirviendo mientras refresher la actualiza en segundo plano.
+    """
+    global _actual, _descargado
+    with _lock:
+        if _actual is None:
+            guardado = _leer_disco()
+            if guardado is not None:
+                _descargado, variables = guardado
+                _actual = Catalogo(variables)
+        actual, descargado = _actual, _descargado
+
+    if actual is None:
+        _actualizar(descargar)
+        with _lock:
+            return _actual if _actual is not None else Catalogo([])
+
+    if time.time() - descargado > refresher.frescura("catalogo"):
+        refresher.programar(("catalogo",), lambda: _actualizar(descargar))
+    return actual
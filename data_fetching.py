@@ -1,69 +1,235 @@
 # data_fetching.py
 
-import requests
+import numpy as np
 import pandas as pd
-import yfinance as yf
-import streamlit as st
 import datetime
-from functools import lru_cache
-import re
+import logging
+import os
+import threading
+import time
+from functools import wraps
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import alignment
+import cache_backend
+import catalog
+import decoding
+import http_client
+import instrumentation
+import market_data
+import notices
+import refresher
+import resilience
+import series_store
+from range_cache import cache_por_rango
+
+logger = logging.getLogger("monitor")
+
+# URLs base de las APIs. Se pueden apuntar al servidor local de replay_server.py
+# (p. ej. BCRA_API_BASE=http://127.0.0.1:8765) para medir sin salir a internet.
+BCRA_API_BASE = os.environ.get("BCRA_API_BASE", "https://api.bcra.gob.ar").rstrip("/")
+BLUELYTICS_API_BASE = os.environ.get("BLUELYTICS_API_BASE", "https://api.bluelytics.com.ar").rstrip("/")
+# Vacío = yfinance real; si se define, Yahoo se reemplaza por el endpoint /yahoo/close del replay
+YAHOO_API_BASE = os.environ.get("YAHOO_API_BASE", "").rstrip("/")
+
+BCRA_MONETARIAS_BASE = f"{BCRA_API_BASE}/estadisticas/v3.0/monetarias"
+BCRA_COTIZACIONES_BASE = f"{BCRA_API_BASE}/estadisticascambiarias/v1.0/Cotizaciones"
+BLUELYTICS_EVOLUTION_URL = f"{BLUELYTICS_API_BASE}/v2/evolution.json"
+
+# Host de cada origen, para los plazos e interruptores de resilience
+HOST_BCRA = urlparse(BCRA_API_BASE).netloc
+HOST_BLUELYTICS = urlparse(BLUELYTICS_API_BASE).netloc
+HOST_YAHOO = urlparse(YAHOO_API_BASE).netloc or "yahoo"
+
+# Paginación de /monetarias: tamaño de página y páginas pedidas en simultáneo
+BCRA_PAGE_LIMIT = 3000
+_paginas_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="bcra-pag")
+
+
+# --- Catálogo de variables monetarias (ver catalog.py) ---
+
+def _listar_variables_monetarias() -> list[dict]:
+    """Trae el catálogo actual de variables monetarias (v3.0): la lista 'results' de /monetarias."""
+    r = http_client.get(BCRA_MONETARIAS_BASE, verify=False)
+    r.raise_for_status()
+    return decoding.cargar_json(r.content).get("results", [])
 
-BCRA_MONETARIAS_BASE = "https://api.bcra.gob.ar/estadisticas/v3.0/monetarias"
 
-'''@lru_cache(maxsize=1)
-def _listar_variables_monetarias() -> pd.DataFrame:
-    """Trae el catálogo actual de variables monetarias (v3.0)."""
-    r = requests.get(BCRA_MONETARIAS_BASE, timeout=15, verify=False)
-    r.raise_for_status()
-    data = r.json().get("results", [])
-    df = pd.DataFrame(data)
-    # Normalizo texto para búsquedas robustas
-    if not df.empty and "descripcion" in df.columns:
-        df["desc_norm"] = (
-            df["descripcion"]
-            .astype(str)
-            .str.normalize("NFKD")
-            .str.encode("ascii", errors="ignore")
-            .str.decode("utf-8")
-            .str.lower()
-        )
-    return df
+def catalogo_bcra() -> catalog.Catalogo:
+    """Catálogo indexado (cacheado en disco; solo se descarga si no hay copia local)."""
+    return catalog.obtener(_listar_variables_monetarias)
 
-def _id_por_descripcion(patrones: list[str]) -> int | None:
-    """Devuelve el idVariable cuyo 'descripcion' matchee cualquiera de los patrones (regex/contains)."""
-    dfv = _listar_variables_monetarias()
-    if dfv.empty:
-        return None
-    candidates = pd.Series(False, index=dfv.index)
-    for p in patrones:
-        # contiene o regex sencillo
-        try:
-            candidates |= dfv["desc_norm"].str.contains(p, regex=True)
-        except re.error:
-            candidates |= dfv["desc_norm"].str.contains(re.escape(p))
-    sub = dfv[candidates]
-    if sub.empty:
-        return None
-    # Si hay varios, elegir el más “obvio”: el de descripción más corta
-    sub = sub.assign(len_desc=sub["descripcion"].str.len()).sort_values("len_desc")
-    return int(sub.iloc[0]["idVariable"])
 
-def _debug_aviso(st_label: str, id_var: int):
-    dfv = _listar_variables_monetarias()
-    if not dfv.empty:
-        row = dfv[dfv["idVariable"] == id_var]
-        if not row.empty:
-            st.info(f"{st_label}: usando idVariable={id_var} → {row.iloc[0]['descripcion']}")'''
+def _id_por_descripcion(consulta: str) -> int | None:
+    """Devuelve el idVariable cuya 'descripcion' mejor coincide con la consulta (ver Catalogo.buscar)."""
+    try:
+        return catalogo_bcra().id_por_descripcion(consulta)
+    except Exception as e:
+        notices.error(f"No pude obtener el catálogo de variables del BCRA: {e}")
+        return None
 
 
+# --- Single-flight: una sola descarga por clave, compartida entre hilos y sesiones ---
+
+class _Vuelo:
+    def __init__(self):
+        self.evento = threading.Event()
+        self.valor = None
+        self.error = None
+
+_sf_lock = threading.Lock()
+_sf_en_vuelo = {}     # clave -> _Vuelo en curso
+_sf_resultados = {}   # clave -> (vence, valor)
+
+
+def single_flight(ttl: float = 60):
+    """Decorador: las llamadas simultáneas con los mismos argumentos esperan a una única
+    ejecución y comparten su resultado, que además queda en cache `ttl` segundos.
+
+    El resultado es compartido entre todos los que llaman: no hay que modificarlo in place.
+    """
+    def decorador(fn):
+        @wraps(fn)
+        def wrapper(*args):
+            clave = (fn.__qualname__,) + args
+            with _sf_lock:
+                hit = _sf_resultados.get(clave)
+                if hit is not None and hit[0] > time.monotonic():
+                    instrumentation.marcar_cache(hit=True)
+                    return hit[1]
+                vuelo = _sf_en_vuelo.get(clave)
+                lider = vuelo is None
+                if lider:
+                    vuelo = _sf_en_vuelo[clave] = _Vuelo()
+
+            instrumentation.marcar_cache(hit=not lider)
+            if not lider:
+                vuelo.evento.wait()
+                if vuelo.error is not None:
+                    raise vuelo.error
+                return vuelo.valor
+
+            try:
+                vuelo.valor = fn(*args)
+                with _sf_lock:
+                    _sf_resultados[clave] = (time.monotonic() + ttl, vuelo.valor)
+            except Exception as e:
+                vuelo.error = e
+                raise
+            finally:
+                with _sf_lock:
+                    del _sf_en_vuelo[clave]
+                vuelo.evento.set()
+            return vuelo.valor
+        return wrapper
+    return decorador
 
 
 # --- Funciones para obtención de datos ---
 
-def get_bcra_variable(id_variable, start_date, end_date):
-    import requests, pandas as pd
-    from datetime import datetime
+class _ErrorBCRA(Exception):
+    """Error informado por la API del BCRA (ya formateado para mostrar)."""
+
+
+def _pedir_pagina_bcra(id_variable, url, params) -> dict:
+    r = http_client.get(url, params=params, verify=False)
+    # Si el servidor responde 400/404/500, intento extraer el mensaje de error de la API
+    if r.status_code != 200:
+        try:
+            payload = r.json()
+            msgs = payload.get("errorMessages") or []
+            msg = "; ".join(msgs) if msgs else r.text
+        except Exception:
+            msg = r.text
+        if r.status_code == 400:
+            raise _ErrorBCRA(f"Error 400 BCRA: {msg}")
+        elif r.status_code == 404:
+            raise _ErrorBCRA(f"Error 404 BCRA (idVariable={id_variable}): {msg}")
+        raise _ErrorBCRA(f"Error {r.status_code} BCRA: {msg}")
+    return decoding.cargar_json(r.content)
+
+
+def _columnas_bcra(data: dict) -> tuple[np.ndarray, np.ndarray]:
+    """Pasa los 'results' de una página a dos columnas tipadas (fechas, valores)."""
+    return decoding.columnas_bcra(data)
+
+
+def _df_bcra(paginas: list, id_variable) -> pd.DataFrame:
+    """Arma el DataFrame (idVariable, fecha, valor) con las columnas de cada página, en orden."""
+    df = pd.DataFrame({
+        "fecha": np.concatenate([p[0] for p in paginas]),
+        "valor": np.concatenate([p[1] for p in paginas]),
+    })
+    df.insert(0, "idVariable", id_variable)
+    return df
+
+
+def _descargar_bcra_variable(id_variable, desde, hasta):
+    """Descarga la variable en [desde, hasta]. Lanza _ErrorBCRA (ya formateado) si hubo error.
+
+    Con la primera página se conoce el total (metadata.resultset.count) y el resto
+    de las páginas se piden en paralelo; se arman en orden de offset.
+    """
+    url = f"{BCRA_MONETARIAS_BASE}/{id_variable}"
+    lim = BCRA_PAGE_LIMIT
+    params = {"desde": desde, "hasta": hasta, "limit": lim}
+
+    def _pagina(offset):
+        return _columnas_bcra(_pedir_pagina_bcra(id_variable, url, {**params, "offset": offset}))
 
+    try:
+        data = _pedir_pagina_bcra(id_variable, url, {**params, "offset": 0})
+        paginas = [_columnas_bcra(data)]
+        meta = (data.get("metadata") or {}).get("resultset") or {}
+        total = meta.get("count", None)
+
+        # el servidor puede devolver páginas más chicas que `limit`: avanzo según lo recibido
+        paso = len(paginas[0][0]) or lim
+        if total is not None:
+            # cada página corre con una copia del contexto para que las métricas sigan sumando acá
+            tareas = [(contextvars.copy_context(), off) for off in range(paso, int(total), paso)]
+            paginas.extend(_paginas_pool.map(lambda t: t[0].run(_pagina, t[1]), tareas))
+        else:
+            # sin metadata: sigo paginando de a una mientras vengan páginas completas
+            offset = 0
+            while len(paginas[-1][0]) == paso:
+                offset += paso
+                paginas.append(_pagina(offset))
+
+        return _df_bcra(paginas, id_variable)
+
+    except _ErrorBCRA:
+        raise
+    except Exception as e:
+        raise _ErrorBCRA(f"Error al conectar con la API del BCRA: {e}") from e
+
+
+@cache_por_rango(lambda id_variable: f"bcra:{id_variable}")
+@cache_backend.compartido(lambda id_variable: f"bcra:{id_variable}")
+def _get_bcra_variable(id_variable, desde, hasta):
+    """Serie de la variable entre desde y hasta ('YYYY-MM-DD', ya validadas), sin avisos al
+    usuario: range_cache la llama también para los bordes y las revalidaciones, donde un
+    tramo vacío es normal. Si la API falla, devuelve lo guardado marcado como desactualizado.
+    """
+    # Solo voy a la API por los tramos que el cache local todavía no tiene
+    # (normalmente, la cola desde el último dato publicado hasta hoy).
+    for tramo_desde, tramo_hasta in series_store.rangos_faltantes(id_variable, desde, hasta):
+        try:
+            df_tramo = _descargar_bcra_variable(id_variable, tramo_desde, tramo_hasta)
+        except _ErrorBCRA as e:
+            # la API falló: lo que ya estaba guardado (si hay algo) es el último dato bueno.
+            # La marca también le avisa a range_cache que este tramo no quedó cubierto.
+            logger.warning(f"BCRA, variable {id_variable}: {e}")
+            resilience.marcar_desactualizado(HOST_BCRA)
+            break
+        series_store.guardar(id_variable, df_tramo, tramo_desde, tramo_hasta)
+    return series_store.leer(id_variable, desde, hasta)
+
+
+@instrumentation.medido()
+def get_bcra_variable(id_variable, start_date, end_date):
     def _norm(d: str) -> str:
         # acepta 'YYYY-MM-DD' o datetime/date y normaliza a 'YYYY-MM-DD'
         if hasattr(d, "strftime"):
@@ -77,206 +243,321 @@ def get_bcra_variable(id_variable, start_date, end_date):
 
     # validación rápida de formato y orden (requisito v3.0)
     try:
-        d_desde = datetime.strptime(desde, "%Y-%m-%d")
-        d_hasta = datetime.strptime(hasta, "%Y-%m-%d")
+        d_desde = datetime.datetime.strptime(desde, "%Y-%m-%d")
+        d_hasta = datetime.datetime.strptime(hasta, "%Y-%m-%d")
     except ValueError:
-        st.error(f"Fechas inválidas (usa YYYY-MM-DD). Recibí desde='{desde}', hasta='{hasta}'.")
+        notices.error(f"Fechas inválidas (usa YYYY-MM-DD). Recibí desde='{desde}', hasta='{hasta}'.")
         return pd.DataFrame()
     if d_desde > d_hasta:
-        st.warning("Intercambié las fechas porque 'desde' > 'hasta'.")
+        notices.warning("Intercambié las fechas porque 'desde' > 'hasta'.")
         desde, hasta = hasta, desde
 
-    base = "https://api.bcra.gob.ar/estadisticas/v3.0/monetarias"
-    url = f"{base}/{id_variable}"
-    params = {"desde": desde, "hasta": hasta, "limit": 3000, "offset": 0}
-
-    rows = []
-    try:
-        while True:
-            r = requests.get(url, params=params, verify=False, timeout=15)
-            # Si el servidor responde 400/404/500, intento extraer el mensaje de error de la API
-            if r.status_code != 200:
-                try:
-                    payload = r.json()
-                    msgs = payload.get("errorMessages") or []
-                    msg = "; ".join(msgs) if msgs else r.text
-                except Exception:
-                    msg = r.text
-                if r.status_code == 400:
-                    st.error(f"Error 400 BCRA: {msg}")
-                elif r.status_code == 404:
-                    st.error(f"Error 404 BCRA (idVariable={id_variable}): {msg}")
-                else:
-                    st.error(f"Error {r.status_code} BCRA: {msg}")
-                return pd.DataFrame()
-
-            data = r.json()
-            chunk = data.get("results", [])
-            if not isinstance(chunk, list):
-                chunk = []
-            rows.extend(chunk)
-
-            # cortar si no hay más páginas
-            got = len(chunk)
-            lim = params["limit"]
-            meta = (data.get("metadata") or {}).get("resultset") or {}
-            total = meta.get("count", None)
-            if got < lim or (total is not None and params["offset"] + got >= total):
-                break
-            params["offset"] += lim
-
-        df = pd.DataFrame(rows)
-        if df.empty:
-            st.warning(f"No se encontraron datos para la variable {id_variable} entre {desde} y {hasta}.")
-            return df
-
-        if "fecha" in df.columns:
-            df["fecha"] = pd.to_datetime(df["fecha"], errors="coerce")
-        if "valor" in df.columns:
-            df["valor"] = pd.to_numeric(df["valor"], errors="coerce")
-        return df
-
-    except Exception as e:
-        st.error(f"Error al conectar con la API del BCRA: {e}")
+    # los avisos van sobre el resultado final (ya recortado), no sobre cada tramo pedido
+    with resilience.registro() as marcas:
+        df = _get_bcra_variable(id_variable, desde, hasta)
+    if df.empty:
+        if HOST_BCRA in marcas:
+            notices.error(f"Error al conectar con la API del BCRA: no pude obtener la variable {id_variable}.")
+        else:
+            notices.warning(f"No se encontraron datos para la variable {id_variable} entre {desde} y {hasta}.")
         return pd.DataFrame()
+    return df
 
 
+def _aplanar_cotizaciones(data: list, columna: str) -> pd.DataFrame:
+    """Pasa los 'results' de Cotizaciones (fecha + lista 'detalle') a una fila por fecha,
+    promediando las cotizaciones de cada día."""
+    fechas, valores = decoding.columnas_cotizaciones(data)
+    return pd.DataFrame({"fecha": fechas, columna: valores})
+
+# la API de Cotizaciones devuelve hasta 1000 fechas por pedido
+COTIZACIONES_PAGE_LIMIT = 1000
+
+def _descargar_cotizaciones(moneda: str, columna: str, desde: str, hasta: str) -> pd.DataFrame:
+    """Cotizaciones de `moneda` entre desde y hasta, paginando con offset hasta cubrir
+    metadata.resultset.count (la API puede devolverlas de la más nueva a la más vieja: una
+    sola página dejaría afuera las primeras fechas del tramo)."""
+    url = f"{BCRA_COTIZACIONES_BASE}/{moneda}"
+    resultados, offset = [], 0
+    while True:
+        params = {"fechadesde": desde, "fechahasta": hasta, "limit": COTIZACIONES_PAGE_LIMIT, "offset": offset}
+        r = http_client.get(url, params=params, verify=False)
+        if r.status_code != 200:
+            raise Exception(f"Error al obtener {moneda} oficial")
+        data = decoding.cargar_json(r.content)
+        pagina = data.get("results") or []
+        resultados.extend(pagina)
+        offset += len(pagina)
+        total = ((data.get("metadata") or {}).get("resultset") or {}).get("count")
+        if not pagina:
+            break
+        if total is not None and offset >= total:
+            break
+        if total is None and len(pagina) < COTIZACIONES_PAGE_LIMIT:
+            break
+    return _aplanar_cotizaciones(resultados, columna)
+
+def _cotizacion_oficial(moneda: str, columna: str, desde, hasta) -> pd.DataFrame:
+    """Cotización oficial de `moneda` en [desde, hasta], desde series_store: solo se piden a la
+    API los tramos que faltan (prefetch.py los deja guardados para la app).
+
+    Si la API falla se devuelve lo guardado marcado como desactualizado; si no hay nada
+    guardado, la excepción sigue de largo.
+    """
+    desde, hasta = str(desde)[:10], str(hasta)[:10]
+    error = None
+    for tramo_desde, tramo_hasta in series_store.rangos_faltantes_cotizacion(moneda, desde, hasta):
+        try:
+            df_tramo = _descargar_cotizaciones(moneda, columna, tramo_desde, tramo_hasta)
+        except Exception as e:
+            error = e
+            break
+        series_store.guardar_cotizacion(moneda, df_tramo, columna, tramo_desde, tramo_hasta)
+
+    df = series_store.leer_cotizacion(moneda, columna, desde, hasta)
+    if error is not None:
+        if df.empty:
+            raise error
+        resilience.marcar_desactualizado(HOST_BCRA)
+    return df
 
+@instrumentation.medido()
+def get_usd_oficial(fecha_inicio, fecha_fin):
+    return _cotizacion_oficial("USD", "usd_oficial", fecha_inicio, fecha_fin)
 
+def _df_usd_blue(data) -> pd.DataFrame:
+    """evolution.json (bytes crudos o ya parseado) -> DataFrame (fecha, usd_blue)."""
+    fechas, usd_blue = decoding.columnas_bluelytics(data)
+    df = pd.DataFrame({"fecha": fechas, "usd_blue": usd_blue})
+    df = df.dropna(subset=["fecha", "usd_blue"]).drop_duplicates(subset=["fecha"])
+    return df
 
-def get_usd_oficial(fecha_inicio, fecha_fin):
-    url = "https://api.bcra.gob.ar/estadisticascambiarias/v1.0/Cotizaciones/USD"
-    params = {"fechadesde": fecha_inicio, "fechahasta": fecha_fin, "limit": 1000}
-    r = requests.get(url, params=params, verify=False)
-    data = r.json()["results"]
-    registros = []
-    for d in data:
-        fecha = d["fecha"]
-        for cot in d["detalle"]:
-            registros.append({"fecha": fecha, "usd_oficial": cot["tipoCotizacion"]})
-
-    df = pd.DataFrame(registros)
-    df["fecha"] = pd.to_datetime(df["fecha"])
-    df = df.groupby("fecha").mean(numeric_only=True).reset_index()
-    df = df.dropna(subset=["fecha", "usd_oficial"]).drop_duplicates(subset=["fecha"])
+# evolution.json trae toda la historia: get_tipo_cambio y get_merval (y todas las
+# sesiones abiertas) comparten una sola descarga cada USD_BLUE_TTL segundos.
+# La serie del blue queda en series_store con el ETag / Last-Modified de la respuesta:
+# los pedidos siguientes son condicionales y, si no hubo cambios, el 304 no trae cuerpo.
+USD_BLUE_TTL = refresher.frescura("bluelytics")
+
+@single_flight(ttl=USD_BLUE_TTL)
+@cache_backend.compartido("bluelytics")
+def _pedir_usd_blue(url) -> pd.DataFrame:
+    guardado = series_store.validadores(url)
+    headers = {}
+    if guardado is not None:
+        etag, last_modified = guardado
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+    r = http_client.get(url, headers=headers)
+    if r.status_code == 304:
+        df = series_store.leer_usd_blue(url)
+        if not df.empty:
+            return df
+        r = http_client.get(url)
+    if r.status_code != 200:
+        raise Exception("Error al obtener USD Blue")
+    df = _df_usd_blue(r.content).sort_values("fecha").reset_index(drop=True)
+    series_store.guardar_usd_blue(df, url, r.headers.get("ETag"), r.headers.get("Last-Modified"))
     return df
 
+@instrumentation.medido()
 def get_usd_blue():
-    url = "https://api.bluelytics.com.ar/v2/evolution.json"
-    r = requests.get(url)
-    if r.status_code == 200:
-        data = r.json()
-        blue_data = [entry for entry in data if entry["source"] == "Blue"]
-        df = pd.DataFrame(blue_data)
-        df["fecha"] = pd.to_datetime(df["date"])
-        df["usd_blue"] = (df["value_buy"] + df["value_sell"]) / 2
-        df = df.dropna(subset=["fecha", "usd_blue"]).drop_duplicates(subset=["fecha"])
-        return df[["fecha", "usd_blue"]]
-    else:
-        raise Exception("Error al obtener USD Blue")
+    try:
+        return _pedir_usd_blue(BLUELYTICS_EVOLUTION_URL)
+    except Exception:
+        # sin respuesta de bluelytics: la última serie guardada en series_store (sobrevive
+        # a reinicios), marcada como desactualizada
+        df = series_store.leer_usd_blue(BLUELYTICS_EVOLUTION_URL)
+        if df.empty:
+            raise
+        resilience.marcar_desactualizado(HOST_BLUELYTICS)
+        return df
 
+@instrumentation.medido()
 def get_cny_oficial(start_date, end_date):
-    url = "https://api.bcra.gob.ar/estadisticascambiarias/v1.0/Cotizaciones/CNY"
-    params = {"fechadesde": start_date, "fechahasta": end_date, "limit": 1000}
-    r = requests.get(url, params=params, verify=False)
-    if r.status_code == 200:
-        data = r.json()['results']
-        registros = []
-        for d in data:
-            fecha = d['fecha']
-            for cot in d['detalle']:
-                registros.append({"fecha": fecha, "cny_oficial": cot['tipoCotizacion']})
-        df = pd.DataFrame(registros)
-        df['fecha'] = pd.to_datetime(df['fecha'])
-        return df.groupby('fecha').mean().reset_index()
-    else:
-        raise Exception("Error al obtener CNY Oficial")
+    return _cotizacion_oficial("CNY", "cny_oficial", start_date, end_date)
 
 
 # --- Modifico los get de BCRA ---
 
 
+@instrumentation.medido()
 def get_inflacion(start_date, end_date):
     return get_bcra_variable(27, start_date, end_date)
 
+@instrumentation.medido()
 def get_tasa_monetaria(start_date, end_date):
     return get_bcra_variable(160, start_date, end_date)
 
+@instrumentation.medido()
 def get_reservas(start_date, end_date):
     return get_bcra_variable(1, start_date, end_date)
 
 
-#def get_tasa_monetaria(start_date, end_date):
-    #patrones = [
-        #r"tasa.*pol[ií]tica monetaria",
-        #r"\btpm\b",
-        #r"tasa.*referencia",
-    #]
-    #idv = _id_por_descripcion(patrones)
-    #if idv is None:
-        #st.error("No encontré la serie de Tasa de Política Monetaria en el catálogo del BCRA (v3.0).")
-        #return pd.DataFrame()
-    #_debug_aviso("Tasa monetaria", idv)
-    #return get_bcra_variable(idv, start_date, end_date)
-
-#def get_reservas(start_date, end_date):
-    #patrones = [
-        #r"reservas internacionales",
-        #r"\breservas\b.*(bcra|internacionales)",
-    #]
-    #idv = _id_por_descripcion(patrones)
-    #if idv is None:
-        #st.error("No encontré la serie de Reservas en el catálogo del BCRA (v3.0).")
-        #return pd.DataFrame()
-    #_debug_aviso("Reservas", idv)
-    #return get_bcra_variable(idv, start_date, end_date)
+@instrumentation.medido()
+def get_bcra_por_descripcion(consulta, start_date, end_date):
+    """Serie del BCRA buscada por descripción en el catálogo (p. ej. "reservas internacionales")."""
+    idv = _id_por_descripcion(consulta)
+    if idv is None:
+        notices.error(f"No encontré la serie '{consulta}' en el catálogo del BCRA (v3.0).")
+        return pd.DataFrame()
+    return get_bcra_variable(idv, start_date, end_date)
 
 
 
 # ---  ---
 
-def get_tipo_cambio(start_date, end_date):
-    df_usd_oficial = get_usd_oficial(start_date, end_date)
-    df_usd_blue = get_usd_blue()
-    df_usd_blue = df_usd_blue[df_usd_blue['fecha'].between(start_date, end_date)]
-    df = pd.merge(df_usd_oficial, df_usd_blue, on='fecha', how='outer')
-    df = df.sort_values('fecha').reset_index(drop=True)
-    return df
+class _ErrorYahoo(Exception):
+    """yf.download informó errores y no trajo datos."""
 
-def get_cny(start_date, end_date):
-    df_cny = get_cny_oficial(start_date, end_date)
-    df_cny = df_cny[df_cny['fecha'].between(start_date, end_date)].reset_index(drop=True)
-    return df_cny
 
-def get_merval(start_date, end_date):
-    merval = yf.download("^MERV", start=start_date, end=end_date)
-    merval_close = merval.xs("Close", axis=1, level="Price")
-    merval = merval_close.rename(columns={"^MERV": "merval_ars"}).reset_index()
-    merval = merval.rename(columns={"Date": "fecha"})
+class _CapturaErrores(logging.Handler):
+    def __init__(self):
+        super().__init__(logging.ERROR)
+        self.mensajes = []
 
-    df_usd_blue = get_usd_blue()
-    df_usd_blue = df_usd_blue[df_usd_blue["fecha"].between(start_date, end_date)]
+    def emit(self, record):
+        self.mensajes.append(record.getMessage())
 
-    df = pd.merge(merval, df_usd_blue, on="fecha", how="inner")
-    df["merval_usd"] = df["merval_ars"] / df["usd_blue"]
-    df = df.sort_values("fecha").reset_index(drop=True)
-    return df
 
+# Errores de yfinance que solo dicen que no hay ruedas en el rango (fin de semana, feriado,
+# mercado todavía sin abrir): no son una falla de Yahoo
+_YAHOO_SIN_DATOS = ("no price data found", "data doesn't exist")
 
+def _descargar_yfinance(yf, tickers, start_date, end_date) -> pd.DataFrame:
+    """yf.download, pero lanzando _ErrorYahoo si falló: yfinance no lanza excepciones,
+    solo loguea los errores (y en versiones viejas los deja en yf.shared._ERRORS)."""
+    captura = _CapturaErrores()
+    logger_yf = logging.getLogger("yfinance")
+    logger_yf.addHandler(captura)
+    try:
+        data = yf.download(tickers, start=start_date, end=end_date, progress=False)
+    finally:
+        logger_yf.removeHandler(captura)
+    errores = [m for m in captura.mensajes if m.strip() and "failed download" not in m.lower()]
+    errores += [str(e) for e in getattr(getattr(yf, "shared", None), "_ERRORS", {}).values()]
+    sin_datos = data is None or data.empty or data.isna().all().all()
+    if errores and sin_datos and not all(any(t in e.lower() for t in _YAHOO_SIN_DATOS) for e in errores):
+        raise _ErrorYahoo(f"Yahoo Finance no respondió: {errores[-1]}")
+    return data if data is not None else pd.DataFrame()
+
+def _yf_download(tickers, start_date, end_date) -> pd.DataFrame:
+    """yf.download(...) o, si YAHOO_API_BASE está definido, los cierres del servidor de replay
+    con la misma forma (columnas MultiIndex Price/Ticker, índice 'Date')."""
+    if not YAHOO_API_BASE:
+        # yfinance es el import más caro del proceso (~0,5 s): se carga recién en la primera descarga
+        import yfinance as yf
+        instrumentation.sumar(paginas=1)
+        # yf.download no tiene timeout propio: el plazo y el interruptor los pone resilience
+        return resilience.llamar(HOST_YAHOO, _descargar_yfinance, yf, tickers, start_date, end_date)
+    tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+    r = http_client.get(
+        f"{YAHOO_API_BASE}/yahoo/close",
+        params={"tickers": ",".join(tickers), "start": start_date, "end": end_date},
+    )
+    r.raise_for_status()
+    data = r.json()
+    df = pd.DataFrame({t: pd.Series(dict(data.get(t, []))) for t in tickers}, dtype=float)
+    df.index = pd.to_datetime(df.index)
+    df.index.name = "Date"
+    df.columns = pd.MultiIndex.from_product([["Close"], df.columns], names=["Price", "Ticker"])
+    return df.sort_index()
+
+def _combinar_tipo_cambio(df_usd_oficial, df_usd_blue, start_date, end_date):
+    # Todas las fechas de las dos series, cada una con su dato exacto (el gráfico une los huecos)
+    return alignment.alinear(
+        {
+            "usd_oficial": (df_usd_oficial["fecha"], df_usd_oficial["usd_oficial"]),
+            "usd_blue": (df_usd_blue["fecha"], df_usd_blue["usd_blue"]),
+        },
+        desde=start_date, hasta=end_date,
+    )
+
+@instrumentation.medido()
+@cache_por_rango("cotizaciones")
+@cache_backend.compartido("cotizaciones")
+def get_tipo_cambio(start_date, end_date):
+    return _combinar_tipo_cambio(get_usd_oficial(start_date, end_date), get_usd_blue(), start_date, end_date)
 
+@instrumentation.medido()
+@cache_por_rango("cotizaciones")
+@cache_backend.compartido("cotizaciones")
+def get_cny(start_date, end_date):
+    df_cny = get_cny_oficial(start_date, end_date)
+    df_cny = df_cny[df_cny['fecha'].between(start_date, end_date)].reset_index(drop=True)
+    return df_cny
 
-def get_cedears(start_date, end_date):
-    cedears = {
+CEDEARS = {
     "YPFD.BA": "YPF",
     "GGAL.BA": "Galicia",
     "BMA.BA": "Banco Macro",
     "MELI.BA": "MercadoLibre"
 }
-    data = yf.download(list(cedears.keys()), start=start_date, end=end_date)["Close"]
-    df_cedears = data.reset_index()
-    df_cedears = df_cedears.rename(columns={"Date": "fecha"})
-    for ticker in cedears.keys():
+
+# Todo lo que el tablero pide a Yahoo: se actualiza en una sola descarga
+TICKERS_YAHOO = ["^MERV", *CEDEARS]
+
+def _cierres_yahoo(tickers, start_date, end_date) -> pd.DataFrame:
+    """Cierres (fecha + una columna por ticker) desde el historial local; solo baja lo que falta."""
+    return market_data.cierres(tickers, start_date, end_date, _yf_download, lote=TICKERS_YAHOO, origen=HOST_YAHOO)
+
+# Días hacia atrás que se arrastra el blue en las ruedas del Merval sin cotización del blue
+# (feriados de un calendario que no lo son en el otro; alcanza para un fin de semana largo)
+TOLERANCIA_BLUE_MERVAL = 4
+
+def _combinar_merval(merval, df_usd_blue, start_date, end_date):
+    # Una fila por rueda del Merval, con el último blue disponible
+    df = alignment.alinear(
+        {
+            "merval_ars": (merval["fecha"], merval["^MERV"]),
+            "usd_blue": (df_usd_blue["fecha"], df_usd_blue["usd_blue"]),
+        },
+        calendario="merval_ars",
+        tolerancias={"usd_blue": TOLERANCIA_BLUE_MERVAL},
+        desde=start_date, hasta=end_date,
+        requeridas=["merval_ars", "usd_blue"],
+    )
+    df["merval_usd"] = df["merval_ars"].to_numpy() / df["usd_blue"].to_numpy()
+    return df
+
+@instrumentation.medido()
+@cache_por_rango("yfinance")
+@cache_backend.compartido("yfinance")
+def get_merval(start_date, end_date):
+    merval = _cierres_yahoo(["^MERV"], start_date, end_date).dropna(subset=["^MERV"])
+    return _combinar_merval(merval, get_usd_blue(), start_date, end_date)
+
+@cache_por_rango("yfinance")
+@cache_backend.compartido("yfinance")
+def _get_cedears_close(start_date, end_date):
+    # Precios sin rebasar: el índice 100 depende del rango pedido, así que se calcula después de recortar
+    return _cierres_yahoo(list(CEDEARS), start_date, end_date)
+
+def _rebasar_cedears(df_cedears):
+    """Lleva cada ticker a índice 100 en su primer dato del rango."""
+    if df_cedears.empty:
+        return df_cedears
+    for ticker in CEDEARS.keys():
         if ticker in df_cedears.columns and not df_cedears[ticker].dropna().empty:
             df_cedears[ticker] = (df_cedears[ticker] / df_cedears[ticker].iloc[0]) * 100
-    df_cedears = df_cedears.dropna(how="all", subset=list(cedears.keys())).sort_values("fecha").reset_index(drop=True)
+    df_cedears = df_cedears.dropna(how="all", subset=list(CEDEARS.keys())).sort_values("fecha").reset_index(drop=True)
     return df_cedears
+
+@instrumentation.medido()
+def get_cedears(start_date, end_date):
+    return _rebasar_cedears(_get_cedears_close(start_date, end_date))
+
+
+# --- Fuentes del tablero (app.py y prefetch.py) ---
+
+FUENTES = {
+    "inflacion": get_inflacion,
+    "tasa": get_tasa_monetaria,
+    "reservas": get_reservas,
+    "tipo_cambio": get_tipo_cambio,
+    "cny": get_cny,
+    "merval": get_merval,
+    "cedears": get_cedears,
+}
+TIMEOUTS_FUENTES = {"merval": 45, "cedears": 45}  # Yahoo suele ser la fuente más lenta
@@ -0,0 +1,100 @@
+# decoding.py
+"""Decodificación de las respuestas JSON directo a columnas tipadas (datetime64 / float64).
+
+Usa orjson (y ijson para recorrer en streaming payloads grandes como evolution.json de
+bluelytics), los dos en requirements.txt; si faltan, cae al módulo json de la biblioteca
+estándar.
+"""
+
+import io
+import json
+
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:  # opcional
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # opcional
+    ijson = None
+
+# A partir de este tamaño (bytes) se recorre en streaming si ijson está disponible
+UMBRAL_STREAMING = 2 * 1024 * 1024
+
+
+def cargar_json(contenido: bytes):
+    """json.loads rápido (orjson) sobre el cuerpo crudo de la respuesta."""
+    if orjson is not None:
+        return orjson.loads(contenido)
+    return json.loads(contenido)
+
+
+def fechas(valores) -> np.ndarray:
+    """Lista de 'YYYY-MM-DD' (o None) -> datetime64[ns]. Lo que no se pueda leer queda NaT."""
+    try:
+        return np.array(valores, dtype="datetime64[D]").astype("datetime64[ns]")
+    except (ValueError, TypeError):
+        return pd.to_datetime(pd.Series(valores, dtype=object), errors="coerce").to_numpy("datetime64[ns]")
+
+
+def numeros(valores) -> np.ndarray:
+    """Lista de números (o None) -> float64. Lo que no sea numérico queda NaN."""
+    try:
+        return np.array(valores, dtype=np.float64)
+    except (ValueError, TypeError):
+        return pd.to_numeric(pd.Series(valores, dtype=object), errors="coerce").to_numpy(np.float64)
+
+
+# --- BCRA monetarias ---
+
+def columnas_bcra(data: dict) -> tuple[np.ndarray, np.ndarray]:
+    """'results' de una página de /monetarias -> (fechas, valores)."""
+    chunk = data.get("results", [])
+    if not isinstance(chunk, list):
+        chunk = []
+    return fechas([x.get("fecha") for x in chunk]), numeros([x.get("valor") for x in chunk])
+
+
+# --- BCRA cotizaciones ---
+
+def columnas_cotizaciones(results: list) -> tuple[np.ndarray, np.ndarray]:
+    """'results' de /Cotizaciones (fecha + lista 'detalle') -> una fila por fecha, ordenada,
+    con el promedio de las cotizaciones del día (ignorando faltantes)."""
+    pares = [(d["fecha"], cot["tipoCotizacion"]) for d in results for cot in d["detalle"]]
+    if not pares:
+        return np.array([], dtype="datetime64[ns]"), np.array([], dtype=np.float64)
+    fs, vs = zip(*pares)
+    f = fechas(fs)
+    v = numeros(vs)
+
+    unicas, grupo = np.unique(f, return_inverse=True)
+    validos = ~np.isnan(v)
+    cantidad = np.bincount(grupo, weights=validos, minlength=len(unicas))
+    suma = np.bincount(grupo, weights=np.where(validos, v, 0.0), minlength=len(unicas))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        promedio = np.where(cantidad > 0, suma / np.maximum(cantidad, 1), np.nan)
+    return unicas, promedio
+
+
+# --- bluelytics ---
+
+def _filas_blue(data) -> list:
+    if isinstance(data, (bytes, bytearray)):
+        if ijson is not None and len(data) > UMBRAL_STREAMING:
+            # solo se materializan las filas "Blue", no el historial completo de todas las fuentes
+            return [x for x in ijson.items(io.BytesIO(data), "item", use_float=True) if x.get("source") == "Blue"]
+        data = cargar_json(data)
+    return [x for x in data if x.get("source") == "Blue"]
+
+
+def columnas_bluelytics(data) -> tuple[np.ndarray, np.ndarray]:
+    """evolution.json (bytes crudos o ya parseado) -> (fechas, promedio compra/venta del blue)."""
+    filas = _filas_blue(data)
+    f = fechas([x.get("date") for x in filas])
+    compra = numeros([x.get("value_buy") for x in filas])
+    venta = numeros([x.get("value_sell") for x in filas])
+    return f, (compra + venta) / 2
@@ -0,0 +1,92 @@
+# fetch_orchestrator.py
+
+import time
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+import notices
+import resilience
+
+# Timeout por defecto (segundos) para cada fuente
+TIMEOUT_DEFAULT = 30
+
+# Pool compartido por todas las sesiones: una fuente colgada no bloquea el render,
+# solo ocupa un worker hasta que termina.
+_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="fetch")
+
+
+@dataclass
+class ResultadoFuente:
+    """Resultado de descargar una fuente: datos, error y tiempo insumido.
+
+    `desactualizado` mapea host -> hora (time.time()) del último dato bueno para las
+    partes que se sirvieron de respaldo porque el origen no respondió.
+    """
+    nombre: str
+    df: pd.DataFrame
+    error: str | None = None
+    segundos: float = 0.0
+    desactualizado: dict = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.df is not None and not self.df.empty
+
+
+def _ejecutar(fn, args, ctx):
+    # Los avisos (notices) de las funciones de data_fetching necesitan el contexto de la sesión
+    if ctx is not None:
+        from streamlit.runtime.scriptrunner import add_script_run_ctx
+        add_script_run_ctx(threading.current_thread(), ctx)
+    t0 = time.perf_counter()
+    with resilience.registro() as marcas:
+        df = fn(*args)
+    return df, time.perf_counter() - t0, marcas
+
+
+def en_orden_de_llegada(fuentes: dict, start_date, end_date, timeouts: dict | None = None):
+    """Ejecuta todas las fuentes a la vez y va devolviendo (generador) cada ResultadoFuente
+    apenas termina o se le vence el timeout, así se puede mostrar sin esperar a las demás.
+
+    `fuentes` mapea nombre -> función get_*(start_date, end_date). Cada fuente tiene
+    su propio timeout (`timeouts[nombre]` o TIMEOUT_DEFAULT), contado desde el inicio.
+    """
+    timeouts = timeouts or {}
+    ctx = notices.contexto_streamlit()
+
+    t0 = time.perf_counter()
+    futuros = {
+        _pool.submit(_ejecutar, fn, (start_date, end_date), ctx): nombre
+        for nombre, fn in fuentes.items()
+    }
+    limite = {f: timeouts.get(nombre, TIMEOUT_DEFAULT) for f, nombre in futuros.items()}
+
+    pendientes = set(futuros)
+    while pendientes:
+        restante = min(limite[f] for f in pendientes) - (time.perf_counter() - t0)
+        listos, _ = wait(pendientes, timeout=max(restante, 0), return_when=FIRST_COMPLETED)
+        for futuro in listos:
+            pendientes.discard(futuro)
+            nombre = futuros[futuro]
+            try:
+                df, segundos, marcas = futuro.result()
+                yield ResultadoFuente(nombre, df, segundos=segundos, desactualizado=marcas)
+            except Exception as e:
+                yield ResultadoFuente(nombre, pd.DataFrame(), error=str(e), segundos=time.perf_counter() - t0)
+
+        transcurrido = time.perf_counter() - t0
+        for futuro in [f for f in pendientes if limite[f] <= transcurrido]:
+            pendientes.discard(futuro)
+            yield ResultadoFuente(
+                futuros[futuro], pd.DataFrame(), error="Tiempo de espera agotado", segundos=transcurrido,
+            )
+
+
+def descargar_en_paralelo(fuentes: dict, start_date, end_date, timeouts: dict | None = None) -> dict:
+    """Ejecuta todas las fuentes a la vez y devuelve {nombre: ResultadoFuente} cuando terminaron
+    todas (ver en_orden_de_llegada para los timeouts)."""
+    resultados = {r.nombre: r for r in en_orden_de_llegada(fuentes, start_date, end_date, timeouts)}
+    return {nombre: resultados[nombre] for nombre in fuentes}
@@ -0,0 +1,116 @@
+# http_client.py
+
+import os
+import time
+import random
+import threading
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import instrumentation
+import resilience
+
+# Timeouts (segundos) y reintentos, configurables por variables de entorno
+CONNECT_TIMEOUT = float(os.environ.get("HTTP_CONNECT_TIMEOUT", 5))
+READ_TIMEOUT = float(os.environ.get("HTTP_READ_TIMEOUT", 20))
+MAX_REINTENTOS = int(os.environ.get("HTTP_MAX_REINTENTOS", 3))
+BACKOFF_BASE = float(os.environ.get("HTTP_BACKOFF_BASE", 0.5))
+BACKOFF_MAX = 10.0
+
+# Tamaño del pool por host: alcanza para el fetch en paralelo de varias sesiones
+POOL_MAXSIZE = int(os.environ.get("HTTP_POOL_MAXSIZE", 32))
+
+# Respuestas transitorias que vale la pena reintentar
+ESTADOS_REINTENTABLES = {429, 500, 502, 503, 504}
+
+_lock = threading.Lock()
+_session = None
+
+
+def get_session() -> requests.Session:
+    """Devuelve la Session compartida del proceso (keep-alive y pool de conexiones)."""
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                s = requests.Session()
+                adapter = HTTPAdapter(pool_connections=8, pool_maxsize=POOL_MAXSIZE, pool_block=False)
+                s.mount("https://", adapter)
+                s.mount("http://", adapter)
+                s.headers.update({"Accept-Encoding": "gzip, deflate", "Accept": "application/json"})
+                _session = s
+    return _session
+
+
+def _espera(intento: int, respuesta=None) -> float:
+    """Backoff exponencial con jitter completo; respeta Retry-After si viene en la respuesta."""
+    if respuesta is not None:
+        retry_after = respuesta.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), BACKOFF_MAX)
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** intento)))
+
+
+def _timeout_acotado(timeout, restante: float):
+    """El timeout pedido, sin pasarse de lo que queda del plazo del host."""
+    if isinstance(timeout, tuple):
+        return tuple(min(t, restante) for t in timeout)
+    return min(timeout, restante)
+
+
+def get(url, params=None, timeout=None, **kwargs) -> requests.Response:
+    """GET con la Session compartida, timeouts por defecto y reintentos ante 5xx/429 y errores de red.
+
+    Todos los intentos juntos respetan el plazo del host (resilience.plazo) y pasan por su
+    interruptor: con el circuito abierto se lanza resilience.CircuitoAbierto sin salir a la red.
+
+    Si se agotan los reintentos devuelve la última respuesta (o relanza la última excepción),
+    así el llamador sigue manejando los códigos de error como antes.
+    """
+    timeout = timeout or (CONNECT_TIMEOUT, READ_TIMEOUT)
+    host = urlparse(url).netloc
+    inter = resilience.interruptor(host)
+    inter.permitir()
+    limite = time.monotonic() + resilience.plazo(host)
+    ultimo_error = None
+    r = None
+    try:
+        for intento in range(MAX_REINTENTOS + 1):
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                # se fue el plazo durante la espera (o era 0): cuenta como falla y se
+                # devuelve lo último, si llegó algo
+                inter.fallo()
+                if ultimo_error is not None:
+                    raise ultimo_error
+                if r is None:
+                    raise requests.Timeout(f"Sin plazo para pedir a {host}")
+                return r
+            try:
+                r = get_session().get(url, params=params, timeout=_timeout_acotado(timeout, restante), **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                restante = limite - time.monotonic()
+                if intento == MAX_REINTENTOS or restante <= 0:
+                    inter.fallo()
+                    raise
+                ultimo_error = e
+                time.sleep(min(_espera(intento), restante))
+                continue
+            ultimo_error = None
+            # bytes en el cable (comprimidos) si el servidor los informa
+            largo = r.headers.get("Content-Length")
+            instrumentation.sumar(bytes=int(largo) if largo and largo.isdigit() else len(r.content), paginas=1)
+            restante = limite - time.monotonic()
+            if r.status_code not in ESTADOS_REINTENTABLES:
+                inter.exito()
+                return r
+            espera = _espera(intento, r)
+            if intento == MAX_REINTENTOS or espera >= restante:
+                inter.fallo()
+                return r
+            time.sleep(espera)
+    except BaseException:
+        inter.soltar()
+        raise
@@ -0,0 +1,205 @@
+# instrumentation.py
+"""Mediciones por fuente (get_*) y por gráfico (plot_*): tiempo, bytes, páginas y cache.
+
+- Las funciones se envuelven con @medido; lo que pasa adentro (http_client, range_cache,
+  single_flight, cache_backend) suma bytes / páginas / hits a todas las mediciones activas.
+- Exportación: resumen() para el panel de debug, texto_prometheus() para /metrics
+  (servidor opcional con METRICAS_PUERTO) y un log JSON-lines opcional (METRICAS_JSONL).
+"""
+
+import os
+import json
+import time
+import threading
+import contextvars
+from collections import deque
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+# Muestras que se guardan por fuente para calcular percentiles
+MUESTRAS_POR_FUENTE = 500
+
+METRICAS_JSONL = os.environ.get("METRICAS_JSONL", "")
+METRICAS_PUERTO = int(os.environ.get("METRICAS_PUERTO", 0) or 0)
+
+_lock = threading.Lock()
+_muestras = {}    # fuente -> deque de dicts
+_totales = {}     # fuente -> {"llamadas", "bytes", "paginas", "hits", "misses", "errores"}
+
+# Mediciones activas en el contexto actual (de la más externa a la más interna)
+_activas = contextvars.ContextVar("mediciones_activas", default=())
+
+# Funciones que agregan líneas propias a /metrics (ver registrar_metricas)
+_extras = []
+
+
+class _Medicion:
+    def __init__(self, fuente):
+        self.fuente = fuente
+        self.lock = threading.Lock()
+        self.bytes = 0
+        self.paginas = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def cache(self):
+        if self.misses:
+            return "miss"
+        return "hit" if self.hits else None
+
+
+def sumar(bytes: int = 0, paginas: int = 0) -> None:
+    """Suma bytes descargados / páginas pedidas a todas las mediciones activas."""
+    for m in _activas.get():
+        with m.lock:
+            m.bytes += bytes
+            m.paginas += paginas
+
+
+def marcar_cache(hit: bool) -> None:
+    """Registra un acierto (o fallo) de cache en todas las mediciones activas."""
+    for m in _activas.get():
+        with m.lock:
+            if hit:
+                m.hits += 1
+            else:
+                m.misses += 1
+
+
+def _registrar(m: _Medicion, segundos: float, error: str | None) -> None:
+    muestra = {
+        "ts": time.time(),
+        "fuente": m.fuente,
+        "segundos": segundos,
+        "bytes": m.bytes,
+        "paginas": m.paginas,
+        "cache": m.cache,
+        "error": error,
+    }
+    with _lock:
+        _muestras.setdefault(m.fuente, deque(maxlen=MUESTRAS_POR_FUENTE)).append(muestra)
+        t = _totales.setdefault(m.fuente, dict.fromkeys(["llamadas", "bytes", "paginas", "hits", "misses", "errores"], 0))
+        t["llamadas"] += 1
+        t["bytes"] += m.bytes
+        t["paginas"] += m.paginas
+        t["hits"] += m.cache == "hit"
+        t["misses"] += m.cache == "miss"
+        t["errores"] += error is not None
+        if METRICAS_JSONL:
+            with open(METRICAS_JSONL, "a", encoding="utf-8") as f:
+                f.write(json.dumps(muestra) + "\n")
+
+
+def medido(fuente: str | None = None):
+    """Decorador que mide cada llamada de la función bajo el nombre `fuente` (default: su nombre)."""
+    def decorador(fn):
+        nombre = fuente or fn.__name__
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            m = _Medicion(nombre)
+            token = _activas.set(_activas.get() + (m,))
+            t0 = time.perf_counter()
+            error = None
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                error = type(e).__name__
+                raise
+            finally:
+                _activas.reset(token)
+                _registrar(m, time.perf_counter() - t0, error)
+        return wrapper
+    return decorador
+
+
+def resumen() -> list[dict]:
+    """Una fila por fuente con p50/p99 de tiempo, totales y tasa de aciertos de cache."""
+    filas = []
+    with _lock:
+        for fuente, muestras in sorted(_muestras.items()):
+            tiempos = np.fromiter((x["segundos"] for x in muestras), dtype=float)
+            t = _totales[fuente]
+            con_cache = t["hits"] + t["misses"]
+            filas.append({
+                "fuente": fuente,
+                "llamadas": t["llamadas"],
+                "p50_ms": round(float(np.percentile(tiempos, 50)) * 1000, 1),
+                "p99_ms": round(float(np.percentile(tiempos, 99)) * 1000, 1),
+                "ultimo_ms": round(muestras[-1]["segundos"] * 1000, 1),
+                "bytes": t["bytes"],
+                "paginas": t["paginas"],
+                "cache_hit_ratio": round(t["hits"] / con_cache, 2) if con_cache else None,
+                "errores": t["errores"],
+            })
+    return filas
+
+
+def texto_prometheus() -> str:
+    """Métricas en formato de texto de Prometheus."""
+    lineas = [
+        "# TYPE monitor_fuente_segundos summary",
+        "# TYPE monitor_fuente_bytes_total counter",
+        "# TYPE monitor_fuente_paginas_total counter",
+        "# TYPE monitor_fuente_cache_total counter",
+        "# TYPE monitor_fuente_errores_total counter",
+    ]
+    with _lock:
+        for fuente, muestras in sorted(_muestras.items()):
+            tiempos = np.fromiter((x["segundos"] for x in muestras), dtype=float)
+            t = _totales[fuente]
+            etiqueta = f'fuente="{fuente}"'
+            for q in (0.5, 0.9, 0.99):
+                lineas.append(f'monitor_fuente_segundos{{{etiqueta},quantile="{q}"}} {np.quantile(tiempos, q):.6f}')
+            lineas.append(f"monitor_fuente_segundos_sum{{{etiqueta}}} {tiempos.sum():.6f}")
+            lineas.append(f"monitor_fuente_segundos_count{{{etiqueta}}} {len(tiempos)}")
+            lineas.append(f"monitor_fuente_bytes_total{{{etiqueta}}} {t['bytes']}")
+            lineas.append(f"monitor_fuente_paginas_total{{{etiqueta}}} {t['paginas']}")
+            lineas.append(f'monitor_fuente_cache_total{{{etiqueta},resultado="hit"}} {t["hits"]}')
+            lineas.append(f'monitor_fuente_cache_total{{{etiqueta},resultado="miss"}} {t["misses"]}')
+            lineas.append(f"monitor_fuente_errores_total{{{etiqueta}}} {t['errores']}")
+    for extra in _extras:
+        lineas.extend(extra())
+    return "\n".join(lineas) + "\n"
+
+
+def registrar_metricas(fn) -> None:
+    """Agrega a texto_prometheus() las líneas que devuelva `fn()` (otros módulos con métricas propias)."""
+    _extras.append(fn)
+
+
+# --- Endpoint /metrics opcional ---
+
+_servidor = None
+
+
+def iniciar_servidor_metricas(puerto: int = METRICAS_PUERTO, host: str = "0.0.0.0"):
+    """Levanta (una sola vez por proceso) un servidor HTTP con /metrics en formato Prometheus."""
+    global _servidor
+    if not puerto or _servidor is not None:
+        return _servidor
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.rstrip("/") != "/metrics":
+                self.send_error(404)
+                return
+            body = texto_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    with _lock:
+        if _servidor is None:
+            _servidor = ThreadingHTTPServer((host, puerto), Handler)
+            _servidor.daemon_threads = True
+            threading.Thread(target=_servidor.serve_forever, name="metricas", daemon=True).start()
+    return _servidor
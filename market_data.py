@@ -0,0 +1,88 @@
+# market_data.py
+"""Cierres diarios de Yahoo Finance (Merval y CEDEARs) con historial local por ticker.
+
+Los cierres quedan en series_store (tabla yahoo_cierres). Cada pedido descarga solo lo
+que falta de cada ticker (la historia anterior a lo guardado o los días nuevos), y todos
+los tickers con el mismo faltante van en un único yf.download. Con el historial ya en
+disco, un arranque en caliente solo pide la última rueda.
+"""
+
+import datetime
+import logging
+import threading
+
+import pandas as pd
+
+import resilience
+import series_store
+
+logger = logging.getLogger("monitor")
+
+# yf.download guarda estado en variables globales del módulo: no admite llamadas
+# simultáneas desde varios hilos (ver fetch_orchestrator). El mismo lock evita que
+# get_merval y get_cedears, que corren en paralelo, descarguen dos veces lo mismo.
+_lock = threading.Lock()
+
+
+def _dia(d) -> datetime.date:
+    return datetime.date.fromisoformat(str(d)[:10])
+
+
+def _tramos_faltantes(cobertura, desde: str, hasta: str) -> list[tuple[str, str]]:
+    """Tramos a descargar para cubrir [desde, hasta], siempre pegados a la cobertura actual."""
+    if cobertura is None:
+        return [(desde, hasta)]
+    c_desde, c_hasta = cobertura
+    tramos = []
+    if desde < c_desde:
+        tramos.append((desde, (_dia(c_desde) - datetime.timedelta(days=1)).isoformat()))
+    if hasta > c_hasta:
+        tramos.append(((_dia(c_hasta) + datetime.timedelta(days=1)).isoformat(), hasta))
+    return tramos
+
+
+def _descargar_tramo(descargar, tickers: list[str], desde: str, hasta: str) -> None:
+    # yfinance toma el fin como exclusivo
+    fin = (_dia(hasta) + datetime.timedelta(days=1)).isoformat()
+    data = descargar(tickers, desde, fin)
+    close = data["Close"] if not data.empty and "Close" in data.columns.get_level_values(0) else pd.DataFrame()
+    # la rueda de hoy puede estar en curso: se guarda, pero no se da por cubierta
+    ayer = (datetime.date.today() - datetime.timedelta(days=1)).isoformat()
+    for ticker in tickers:
+        if ticker in close.columns:
+            series_store.guardar_cierres(ticker, close[ticker], desde, min(hasta, ayer))
+
+
+def cierres(tickers: list[str], desde, hasta, descargar, lote: list[str] = (), origen: str = "yahoo") -> pd.DataFrame:
+    """Cierres de `tickers` en [desde, hasta] (fin inclusivo): columna 'fecha' y una por ticker.
+
+    `descargar(tickers, start, end)` devuelve lo mismo que yf.download (columnas
+    Price/Ticker). Los tickers de `lote` se actualizan junto con los pedidos, así las
+    distintas series de Yahoo del tablero comparten la misma descarga.
+
+    Si la descarga falla se devuelve lo que haya en disco, marcado como desactualizado
+    (resilience) para `origen`; si no hay nada guardado, la excepción sigue de largo.
+    """
+    tickers = list(tickers)
+    desde, hasta = str(desde)[:10], str(hasta)[:10]
+    todos = list(dict.fromkeys([*tickers, *lote]))
+    with _lock:
+        cobertura = series_store.cobertura_cierres(todos)
+        grupos = {}
+        for ticker in todos:
+            for tramo in _tramos_faltantes(cobertura.get(ticker), desde, hasta):
+                grupos.setdefault(tramo, []).append(ticker)
+        error = None
+        for (tramo_desde, tramo_hasta), grupo in grupos.items():
+            try:
+                _descargar_tramo(descargar, grupo, tramo_desde, tramo_hasta)
+            except Exception as e:
+                logger.warning(f"No se pudieron descargar cierres de {origen} ({tramo_desde} a {tramo_hasta}): {e}")
+                error = e
+                break
+    df = series_store.leer_cierres(tickers, desde, hasta)
+    if error is not None:
+        if df[tickers].isna().all().all():
+            raise error
+        resilience.marcar_desactualizado(origen)
+    return df
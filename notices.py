@@ -0,0 +1,43 @@
+# notices.py
+"""Avisos para el usuario (errores / advertencias) sin depender de Streamlit.
+
+Dentro de una sesión de Streamlit se muestran con st.error / st.warning, como siempre;
+fuera de ella (prefetch.py, benchmarks, scripts) van al log.
+
+Streamlit no se importa acá: si nadie lo importó antes, no hay sesión (y los scripts
+se ahorran su import, que cuesta medio segundo).
+"""
+
+import sys
+import logging
+
+logger = logging.getLogger("monitor")
+
+
+def contexto_streamlit():
+    """ScriptRunContext de la sesión actual, o None fuera de Streamlit (sin el warning de "bare mode")."""
+    if "streamlit" not in sys.modules:
+        return None
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    try:
+        return get_script_run_ctx(suppress_warning=True)
+    except TypeError:  # versiones de Streamlit sin suppress_warning
+        return get_script_run_ctx()
+
+
+def _en_streamlit() -> bool:
+    return contexto_streamlit() is not None
+
+
+def error(mensaje: str) -> None:
+    if _en_streamlit():
+        sys.modules["streamlit"].error(mensaje)
+    else:
+        logger.error(mensaje)
+
+
+def warning(mensaje: str) -> None:
+    if _en_streamlit():
+        sys.modules["streamlit"].warning(mensaje)
+    else:
+        logger.warning(mensaje)
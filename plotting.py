@@ -1,8 +1,172 @@
 # plotting.py
 
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+import numpy as np
 import plotly.graph_objects as go
+import plotly.io as pio
 import pandas as pd
 
+import instrumentation
+
+# --- Cache de figuras ---
+
+# Memoria máxima para figuras cacheadas (se mide por el largo del JSON serializado)
+CACHE_FIGURAS_MAX_BYTES = int(os.environ.get("MONITOR_CACHE_FIGURAS_MB", 64)) * 1024 * 1024
+
+_figuras_lock = threading.Lock()
+_figuras = OrderedDict()   # clave -> (figura, json), en orden de uso (LRU)
+_figuras_bytes = 0
+
+
+def huella(df: pd.DataFrame) -> str:
+    """Hash barato del contenido de un DataFrame (columnas, tipos y valores)."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr([(str(c), str(t)) for c, t in df.dtypes.items()]).encode())
+    h.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return h.hexdigest()
+
+
+def con_cache_de_figura(fn):
+    """Decorador para plot_*(df): si ya se armó la figura para un df idéntico (y la misma
+    configuración de render) devuelve la cacheada, sin volver a construirla ni validarla.
+
+    Guarda también el JSON serializado (ver figura_json), con desalojo LRU por memoria.
+    Las figuras cacheadas se comparten: no hay que modificarlas in place.
+    """
+    @wraps(fn)
+    def wrapper(df):
+        global _figuras_bytes
+        clave = (fn.__name__, huella(df), MODO_WEBGL, UMBRAL_WEBGL, puntos_para_ancho())
+        with _figuras_lock:
+            if clave in _figuras:
+                _figuras.move_to_end(clave)
+                instrumentation.marcar_cache(hit=True)
+                return _figuras[clave][0]
+
+        instrumentation.marcar_cache(hit=False)
+        fig = fn(df)
+        texto = pio.to_json(fig, validate=False)
+        with _figuras_lock:
+            if clave not in _figuras:
+                _figuras[clave] = (fig, texto)
+                _figuras_bytes += len(texto)
+            while _figuras_bytes > CACHE_FIGURAS_MAX_BYTES and len(_figuras) > 1:
+                _, (_, viejo) = _figuras.popitem(last=False)
+                _figuras_bytes -= len(viejo)
+        return fig
+
+    return wrapper
+
+
+def limpiar_cache_figuras() -> None:
+    global _figuras_bytes
+    with _figuras_lock:
+        _figuras.clear()
+        _figuras_bytes = 0
+
+
+def figura_json(plot_fn, df: pd.DataFrame) -> str:
+    """JSON de la figura de `plot_fn(df)`, desde el cache si ya estaba."""
+    fig = plot_fn(df)
+    with _figuras_lock:
+        for figura, texto in reversed(_figuras.values()):
+            if figura is fig:
+                return texto
+    return pio.to_json(fig, validate=False)
+
+
+# --- Modo WebGL ---
+
+# "auto": WebGL solo si el gráfico tiene más de UMBRAL_WEBGL puntos; "si" / "no" lo fuerzan
+MODO_WEBGL = os.environ.get("MONITOR_WEBGL", "auto").lower()
+UMBRAL_WEBGL = int(os.environ.get("MONITOR_UMBRAL_WEBGL", 1500))
+
+
+def clase_scatter(total_puntos: int):
+    """go.Scattergl (render WebGL) para gráficos con muchos puntos, go.Scatter (SVG) si no.
+    Los dos aceptan los mismos argumentos que usamos (fill, connectgaps, line, hover)."""
+    if MODO_WEBGL == "si" or (MODO_WEBGL == "auto" and total_puntos > UMBRAL_WEBGL):
+        return go.Scattergl
+    return go.Scatter
+
+
+# --- Reducción de puntos (LTTB) para series diarias largas ---
+
+# Ancho típico de un gráfico en el layout de tres columnas y puntos por pixel a enviar:
+# más de ~1 punto por pixel no se ve, solo agranda el JSON y el render del navegador.
+ANCHO_GRAFICO_PX = 600
+PUNTOS_POR_PX = 1.0
+
+
+def puntos_para_ancho(ancho_px: int | None = None) -> int:
+    return max(int((ancho_px or ANCHO_GRAFICO_PX) * PUNTOS_POR_PX), 10)
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_salida: int) -> np.ndarray:
+    """Índices elegidos por Largest-Triangle-Three-Buckets (versión vectorizada).
+
+    Cada bucket elige el punto que forma el triángulo de mayor área con el promedio del
+    bucket anterior y el del siguiente (en vez del punto elegido en el anterior, que
+    obliga a un loop). Siempre incluye el primer y el último punto.
+    """
+    n = len(x)
+    if n_salida >= n or n_salida < 3:
+        return np.arange(n)
+
+    # buckets internos de tamaño casi igual sobre los puntos 1..n-2
+    n_buckets = n_salida - 2
+    bordes = np.linspace(1, n - 1, n_buckets + 1).astype(np.int64)
+    tamanios = np.diff(bordes)
+    inicio = bordes[:-1]
+    bucket = np.repeat(np.arange(n_buckets), tamanios)
+
+    prom_x = np.add.reduceat(x[1:n - 1], inicio - 1) / tamanios
+    prom_y = np.add.reduceat(y[1:n - 1], inicio - 1) / tamanios
+    # vértice "a": promedio del bucket anterior (el primer punto para el primer bucket)
+    ax = np.concatenate(([x[0]], prom_x[:-1]))[bucket]
+    ay = np.concatenate(([y[0]], prom_y[:-1]))[bucket]
+    # vértice "c": promedio del bucket siguiente (el último punto para el último bucket)
+    cx = np.concatenate((prom_x[1:], [x[-1]]))[bucket]
+    cy = np.concatenate((prom_y[1:], [y[-1]]))[bucket]
+
+    bx, by = x[1:n - 1], y[1:n - 1]
+    area = np.abs((ax - cx) * (by - ay) - (ax - bx) * (cy - ay))
+
+    # primer máximo de cada bucket
+    maximos = np.maximum.reduceat(area, inicio - 1)
+    candidatos = np.flatnonzero(area == maximos[bucket])
+    _, primeros = np.unique(bucket[candidatos], return_index=True)
+    elegidos = candidatos[primeros] + 1
+    return np.concatenate(([0], elegidos, [n - 1]))
+
+
+def reducir_serie(x, y, max_puntos: int | None = None):
+    """Reduce (x, y) a ~max_puntos con LTTB, sin NaN, conservando extremos.
+
+    Mantiene el primer y el último dato (los valores de los títulos) y el mínimo y el
+    máximo de la serie, así el rango del eje Y no cambia.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=float)
+    validos = ~np.isnan(y)
+    x, y = x[validos], y[validos]
+    max_puntos = max_puntos or puntos_para_ancho()
+    if len(y) <= max_puntos:
+        return x, y
+
+    x_num = x.astype("datetime64[ns]").astype(np.int64).astype(float) if np.issubdtype(x.dtype, np.datetime64) else x.astype(float)
+    idx = lttb(x_num, y, max_puntos)
+    idx = np.union1d(idx, [np.argmin(y), np.argmax(y)])
+    return x[idx], y[idx]
+
+
+@instrumentation.medido()
+@con_cache_de_figura
 def plot_inflacion(df):
     df = df.sort_values("fecha").reset_index(drop=True)
 
@@ -10,7 +174,8 @@ def plot_inflacion(df):
     ultimo_mes = df["fecha"].dt.strftime("%B %Y").iloc[-1]
 
     fig = go.Figure()
-    fig.add_trace(go.Scatter(
+    Scatter = clase_scatter(len(df))
+    fig.add_trace(Scatter(
         x=df["fecha"],
         y=df["valor"],
         fill="tozeroy",
@@ -51,7 +216,7 @@ def plot_inflacion(df):
             showgrid=False,
             tickmode="array",
             tickvals=df["fecha"],
-            ticktext=[d.strftime('%b\n%Y') for d in df["fecha"]],
+            ticktext=df["fecha"].dt.strftime('%b\n%Y').tolist(),
             tickfont=dict(color="white"),
             ticks="outside"
         ),
@@ -65,6 +230,8 @@ def plot_inflacion(df):
     )
     return fig
 
+@instrumentation.medido()
+@con_cache_de_figura
 def plot_tasa_monetaria(df):
     df["fecha"] = pd.to_datetime(df["fecha"])
     df = df.sort_values("fecha")
@@ -80,7 +247,8 @@ def plot_tasa_monetaria(df):
     max_y = (df["valor"].max()) * 1.05
 
     fig = go.Figure()
-    fig.add_trace(go.Scatter(
+    Scatter = clase_scatter(len(df))
+    fig.add_trace(Scatter(
         x=df["fecha"],
         y=df["valor"],
         fill="tozeroy",
@@ -120,7 +288,7 @@ def plot_tasa_monetaria(df):
             showgrid=False,
             tickmode="array",
             tickvals=df_tasa_mensual["fecha"],
-            ticktext=[d.strftime('%b\n%Y') for d in df_tasa_mensual["fecha"]],
+            ticktext=df_tasa_mensual["fecha"].dt.strftime('%b\n%Y').tolist(),
             tickfont=dict(color="white"),
             ticks="outside"
         ),
@@ -135,6 +303,8 @@ def plot_tasa_monetaria(df):
     )
     return fig
 
+@instrumentation.medido()
+@con_cache_de_figura
 def plot_reservas(df):
     df["reservas"] = df["valor"] 
     df["fecha"] = pd.to_datetime(df["fecha"])
@@ -147,9 +317,10 @@ def plot_reservas(df):
 
 
     fig = go.Figure()
-    fig.add_trace(go.Scatter(
-        x=df["fecha"],
-        y=df["reservas"] / 1000,
+    x, y = reducir_serie(df["fecha"], df["reservas"] / 1000)
+    fig.add_trace(clase_scatter(len(x))(
+        x=x,
+        y=y,
         fill="tozeroy",
         mode="lines",
         connectgaps=True,
@@ -186,7 +357,7 @@ def plot_reservas(df):
         xaxis=dict(
             showgrid=False,
             tickvals=tickvals,
-            ticktext=[d.strftime('%b\n%Y') for d in tickvals],
+            ticktext=tickvals.dt.strftime('%b\n%Y').tolist(),
             tickfont=dict(color="white"),
             ticks="outside"
         ),
@@ -202,6 +373,8 @@ def plot_reservas(df):
 
     return fig
 
+@instrumentation.medido()
+@con_cache_de_figura
 def plot_tipo_cambio(df):
     tickvals = df["fecha"].dt.to_period("M").drop_duplicates().dt.to_timestamp()
     ultimo_usd_oficial = df["usd_oficial"].dropna().iloc[-1]
@@ -212,18 +385,21 @@ def plot_tipo_cambio(df):
     max_y = df[["usd_oficial", "usd_blue"]].max().max() * 1.05
 
     fig = go.Figure()
-    fig.add_trace(go.Scatter(
-        x=df["fecha"],
-        y=df["usd_oficial"],
+    x_oficial, y_oficial = reducir_serie(df["fecha"], df["usd_oficial"])
+    x_blue, y_blue = reducir_serie(df["fecha"], df["usd_blue"])
+    Scatter = clase_scatter(len(x_oficial) + len(x_blue))
+    fig.add_trace(Scatter(
+        x=x_oficial,
+        y=y_oficial,
         fill="tozeroy",
         mode="lines",
         connectgaps=True,
         line=dict(color="#2ECC71", width=3),
         name="USD Oficial"
     ))
-    fig.add_trace(go.Scatter(
-        x=df["fecha"],
-        y=df["usd_blue"],
+    fig.add_trace(Scatter(
+        x=x_blue,
+        y=y_blue,
         mode="lines",
         connectgaps=True,
         line=dict(color="#2ECC71", width=3, dash="dot"),
@@ -261,7 +437,7 @@ def plot_tipo_cambio(df):
             title="",
             showgrid=False,
             tickvals=tickvals,
-            ticktext=[d.strftime('%b\n%Y') for d in tickvals],
+            ticktext=tickvals.dt.strftime('%b\n%Y').tolist(),
             tickfont=dict(color="white"),
             ticks="outside"
         ),
@@ -283,6 +459,8 @@ def plot_tipo_cambio(df):
     )
     return fig
 
+@instrumentation.medido()
+@con_cache_de_figura
 def plot_cny(df):
     tickvals = df["fecha"].dt.to_period("M").drop_duplicates().dt.to_timestamp()
     ultimo_valor = df["cny_oficial"].dropna().iloc[-1]
@@ -291,9 +469,10 @@ def plot_cny(df):
     max_y = df["cny_oficial"].max() * 1.05
 
     fig = go.Figure()
-    fig.add_trace(go.Scatter(
-        x=df["fecha"],
-        y=df["cny_oficial"],
+    x, y = reducir_serie(df["fecha"], df["cny_oficial"])
+    fig.add_trace(clase_scatter(len(x))(
+        x=x,
+        y=y,
         fill="tozeroy",
         mode="lines",
         connectgaps=True,
@@ -330,7 +509,7 @@ def plot_cny(df):
         xaxis=dict(
             showgrid=False,
             tickvals=tickvals,
-            ticktext=[d.strftime('%b\n%Y') for d in tickvals],
+            ticktext=tickvals.dt.strftime('%b\n%Y').tolist(),
             tickfont=dict(color="white"),
             ticks="outside"
         ),
@@ -345,6 +524,8 @@ def plot_cny(df):
     )
     return fig
 
+@instrumentation.medido()
+@con_cache_de_figura
 def plot_merval(df):
     tickvals = df["fecha"].dt.to_period("M").drop_duplicates().dt.to_timestamp()
     ultimo_valor_merval = df["merval_usd"].dropna().iloc[-1]
@@ -356,9 +537,10 @@ def plot_merval(df):
         return go.Figure()
     fig = go.Figure()
     
-    fig.add_trace(go.Scatter(
-        x=df["fecha"],
-        y=df["merval_usd"],
+    x, y = reducir_serie(df["fecha"], df["merval_usd"])
+    fig.add_trace(clase_scatter(len(x))(
+        x=x,
+        y=y,
         fill="tozeroy",
         mode="lines",
         connectgaps=True,
@@ -395,7 +577,7 @@ def plot_merval(df):
         xaxis=dict(
             showgrid=False,
             tickvals=tickvals,
-            ticktext=[d.strftime('%b\n%Y') for d in tickvals],
+            ticktext=tickvals.dt.strftime('%b\n%Y').tolist(),
             tickfont=dict(color="white"),
             ticks="outside"
         ),
@@ -410,14 +592,17 @@ def plot_merval(df):
     )
     return fig
 
+@instrumentation.medido()
+@con_cache_de_figura
 def plot_cedears(df):
     cedears = {"YPFD.BA": "YPF", "GGAL.BA": "Galicia", "BMA.BA": "Banco Macro", "MELI.BA": "MercadoLibre"}
     colors = ["#FF5733", "#1E90FF", "#2ECC71", "#7FDBFF"]
     primer_mes = df["fecha"].dt.strftime("%B %Y").iloc[0]
 
     fig = go.Figure()
+    Scatter = clase_scatter(len(df) * len(cedears))
     for i, (ticker, name) in enumerate(cedears.items()):
-        fig.add_trace(go.Scatter(
+        fig.add_trace(Scatter(
             x=df["fecha"],
             y=df[ticker],
             mode="lines",
@@ -461,3 +646,22 @@ def plot_cedears(df):
     )
     return fig
 
+
+# --- Layout del tablero (app.py y static_export.py) ---
+
+# Gráfico de cada fuente (claves de data_fetching.FUENTES)
+PANELES = {
+    "inflacion": plot_inflacion,
+    "tasa": plot_tasa_monetaria,
+    "reservas": plot_reservas,
+    "tipo_cambio": plot_tipo_cambio,
+    "cny": plot_cny,
+    "merval": plot_merval,
+    "cedears": plot_cedears,
+}
+# Paneles de cada una de las tres columnas, de arriba hacia abajo
+COLUMNAS = [
+    ["inflacion", "tasa"],
+    ["reservas", "tipo_cambio", "cny"],
+    ["merval", "cedears"],
+]
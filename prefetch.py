@@ -0,0 +1,63 @@
+# prefetch.py
+"""Precarga de los caches locales sin Streamlit, para correr desde cron después de un deploy.
+
+Descarga todas las fuentes del tablero (data_fetching.FUENTES) para el período pedido, así
+las series del BCRA y las cotizaciones oficiales USD / CNY (series.sqlite), el blue de
+bluelytics, los cierres de Yahoo (market_data) y el catálogo de variables quedan en disco y la app no hace descargas en frío en el primer pedido.
+
+Uso:
+    python prefetch.py                         # desde el mínimo que permite elegir la app
+    python prefetch.py --dias 400              # últimos 400 días
+    python prefetch.py --fuentes reservas merval
+
+Ejemplo de crontab (cada 30 minutos):
+    */30 * * * * cd /ruta/al/monitor && python prefetch.py >> prefetch.log 2>&1
+
+Sale con código 1 si alguna fuente no se pudo descargar.
+"""
+
+import sys
+import logging
+import argparse
+import datetime
+
+import data_fetching
+from fetch_orchestrator import descargar_en_paralelo
+
+# Primera fecha que se puede elegir en app.py
+DESDE_DEFAULT = "2023-11-11"
+
+
+def precargar(desde: str, hasta: str, nombres: list[str] | None = None) -> dict:
+    """Descarga las fuentes `nombres` (todas si es None) en [desde, hasta] y devuelve los resultados."""
+    fuentes = {n: f for n, f in data_fetching.FUENTES.items() if not nombres or n in nombres}
+    try:
+        data_fetching.catalogo_bcra()
+    except Exception as e:
+        logging.getLogger("monitor").warning(f"No pude actualizar el catálogo del BCRA: {e}")
+    return descargar_en_paralelo(fuentes, desde, hasta, data_fetching.TIMEOUTS_FUENTES)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--desde", default=None, help=f"fecha inicial YYYY-MM-DD (default {DESDE_DEFAULT})")
+    parser.add_argument("--dias", type=int, default=None, help="alternativa a --desde: días hacia atrás desde --hasta")
+    parser.add_argument("--hasta", default=datetime.date.today().isoformat())
+    parser.add_argument("--fuentes", nargs="*", choices=list(data_fetching.FUENTES), help="default: todas")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    if args.dias is not None:
+        desde = (datetime.date.fromisoformat(args.hasta) - datetime.timedelta(days=args.dias)).isoformat()
+    else:
+        desde = args.desde or DESDE_DEFAULT
+
+    resultados = precargar(desde, args.hasta, args.fuentes)
+    for r in resultados.values():
+        estado = f"{len(r.df)} filas" if r.ok else f"ERROR: {r.error or 'sin datos'}"
+        print(f"{r.nombre:<12} {r.segundos * 1000:>8.0f} ms  {estado}")
+    return 0 if all(r.ok for r in resultados.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
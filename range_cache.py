@@ -0,0 +1,182 @@
+# range_cache.py
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+import pandas as pd
+
+import instrumentation
+import refresher
+import resilience
+from series import SerieCompacta
+
+# Memoria total para las series cacheadas de todas las funciones; al superarla se
+# descartan las menos usadas (y se vuelven a pedir, al store local o a la API, si hacen falta).
+PRESUPUESTO_BYTES = int(os.environ.get("MONITOR_CACHE_SERIES_MB", 256)) * 1024 * 1024
+
+_lru_lock = threading.Lock()
+_lru = OrderedDict()   # (id de la función, clave) -> _Entrada, de la menos a la más usada
+
+
+class _Entrada:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.desde = None
+        self.hasta = None
+        self.serie = None
+        self.vence = 0.0
+        self.nbytes = 0
+        self.desactualizado = {}   # marcas de resilience de la última descarga (host -> último ok)
+
+
+def _unir(*dfs: pd.DataFrame) -> pd.DataFrame:
+    dfs = [d for d in dfs if d is not None and not d.empty and "fecha" in d.columns]
+    if not dfs:
+        return pd.DataFrame()
+    df = pd.concat(dfs, ignore_index=True)
+    df = df.drop_duplicates(subset=["fecha"], keep="last")
+    return df.sort_values("fecha", kind="stable").reset_index(drop=True)
+
+
+def _usar(clave_lru, entrada: _Entrada) -> None:
+    """Marca la entrada como recién usada, actualiza su tamaño y desaloja si se pasó el presupuesto."""
+    with _lru_lock:
+        serie = entrada.serie
+        entrada.nbytes = serie.nbytes if serie is not None else 0
+        _lru[clave_lru] = entrada
+        _lru.move_to_end(clave_lru)
+        total = sum(e.nbytes for e in _lru.values())
+        for clave_vieja in list(_lru):
+            if total <= PRESUPUESTO_BYTES:
+                break
+            if clave_vieja == clave_lru:
+                continue
+            vieja = _lru[clave_vieja]
+            # una entrada tomada por otro hilo no se toca (la está leyendo o ampliando):
+            # se desaloja en un próximo _usar
+            if not vieja.lock.acquire(blocking=False):
+                continue
+            try:
+                del _lru[clave_vieja]
+                total -= vieja.nbytes
+                vieja.serie = None
+                vieja.nbytes = 0
+            finally:
+                vieja.lock.release()
+
+
+def memoria_usada() -> int:
+    with _lru_lock:
+        return sum(e.nbytes for e in _lru.values())
+
+
+def cache_por_rango(fuente):
+    """Decorador para funciones `fn(*args, start_date, end_date)` que devuelven un DataFrame con 'fecha'.
+
+    Guarda, por cada combinación de los argumentos iniciales, la serie sobre el rango más
+    amplio pedido hasta ahora. Un rango incluido se responde recortando en memoria; uno más
+    amplio solo descarga los bordes que faltan. Los bordes se piden solapados un día con lo
+    cacheado, así funciona igual con fuentes de fin inclusivo (BCRA) o exclusivo (Yahoo).
+
+    `fuente` (texto, o función de los argumentos iniciales que lo devuelve) elige la política
+    de frescura de `refresher`: vencida la frescura se sigue sirviendo lo cacheado y la
+    serie se revalida en segundo plano. Si lo descargado vino de un respaldo (resilience),
+    se cachea solo por refresher.REINTENTO y cada acierto lo vuelve a marcar desactualizado.
+
+    Las series se guardan como SerieCompacta (arrays de solo lectura compartidos entre
+    sesiones) dentro de un presupuesto global de memoria (PRESUPUESTO_BYTES).
+    """
+    def decorador(fn):
+        entradas = {}
+        entradas_lock = threading.Lock()
+
+        def _fuente(clave):
+            return fuente(*clave) if callable(fuente) else fuente
+
+        def _revalidar(clave, entrada):
+            desde, hasta = entrada.desde, entrada.hasta
+            ttl = refresher.frescura(_fuente(clave))
+
+            def tarea():
+                with resilience.registro() as marcas:
+                    df = _unir(fn(*clave, desde, hasta))
+                with entrada.lock:
+                    if df.empty or entrada.serie is None or marcas:
+                        entrada.vence = time.monotonic() + refresher.REINTENTO
+                        return
+                    entrada.serie = SerieCompacta.desde_df(_unir(entrada.serie.a_df(), df))
+                    entrada.vence = time.monotonic() + ttl
+                    entrada.desactualizado = {}
+                _usar((id(wrapper), clave), entrada)
+
+            refresher.programar((fn.__qualname__,) + clave, tarea)
+
+        @wraps(fn)
+        def wrapper(*args):
+            *clave, start_date, end_date = args
+            clave = tuple(clave)
+            desde, hasta = str(start_date)[:10], str(end_date)[:10]
+            if desde > hasta:
+                return fn(*args)
+            with entradas_lock:
+                entrada = entradas.setdefault(clave, _Entrada())
+
+            with entrada.lock:
+                if entrada.serie is None:
+                    instrumentation.marcar_cache(hit=False)
+                    with resilience.registro() as marcas:
+                        df = _unir(fn(*clave, desde, hasta))
+                    if df.empty:
+                        # no cacheo vacíos: suelen ser errores de la fuente
+                        return df
+                    entrada.serie = SerieCompacta.desde_df(df)
+                    entrada.desde, entrada.hasta = desde, hasta
+                    entrada.desactualizado = marcas
+                    entrada.vence = time.monotonic() + (
+                        refresher.REINTENTO if marcas else refresher.frescura(_fuente(clave))
+                    )
+                else:
+                    if time.monotonic() > entrada.vence:
+                        _revalidar(clave, entrada)
+                    nuevos = []
+                    with resilience.registro() as marcas:
+                        # un borde que falló (marcado como desactualizado) no amplía el rango
+                        # cubierto: el próximo pedido lo vuelve a intentar
+                        if desde < entrada.desde:
+                            with resilience.registro() as marcas_borde:
+                                nuevos.append(fn(*clave, desde, entrada.desde))
+                            nuevo_desde = entrada.desde if marcas_borde else desde
+                        else:
+                            nuevo_desde = entrada.desde
+                        if hasta > entrada.hasta:
+                            with resilience.registro() as marcas_borde:
+                                nuevos.append(fn(*clave, entrada.hasta, hasta))
+                            nuevo_hasta = entrada.hasta if marcas_borde else hasta
+                        else:
+                            nuevo_hasta = entrada.hasta
+                    instrumentation.marcar_cache(hit=not nuevos)
+                    if nuevos:
+                        entrada.serie = SerieCompacta.desde_df(_unir(entrada.serie.a_df(), *nuevos))
+                        entrada.desde, entrada.hasta = nuevo_desde, nuevo_hasta
+                    if marcas:
+                        entrada.desactualizado = {**entrada.desactualizado, **marcas}
+                        entrada.vence = min(entrada.vence, time.monotonic() + refresher.REINTENTO)
+                    for host, ultimo_ok in entrada.desactualizado.items():
+                        resilience.marcar_desactualizado(host, ultimo_ok)
+                serie = entrada.serie
+            _usar((id(wrapper), clave), entrada)
+            return serie.recortar(desde, hasta)
+
+        def limpiar():
+            with entradas_lock:
+                entradas.clear()
+            with _lru_lock:
+                for k in [k for k in _lru if k[0] == id(wrapper)]:
+                    del _lru[k]
+
+        wrapper.limpiar = limpiar
+        return wrapper
+    return decorador
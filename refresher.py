@@ -0,0 +1,61 @@
+# refresher.py
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Política de frescura por fuente: segundos que un dato se sirve sin revalidar.
+# Las claves "bcra:<id>" pisan a la genérica "bcra".
+POLITICAS_FRESCURA = {
+    "bcra:27": 6 * 3600,    # inflación: se publica una vez por mes
+    "bcra:160": 3600,       # tasa de política monetaria: cambia poco
+    "bcra:1": 3600,         # reservas: diaria, con rezago
+    "bcra": 3600,
+    "cotizaciones": 900,    # USD / CNY oficial (BCRA cambiarias)
+    "bluelytics": 300,      # USD blue
+    "yfinance": 900,        # Merval y CEDEARs
+    "catalogo": 24 * 3600,  # listado de variables de /monetarias (catalog.py)
+}
+FRESCURA_DEFAULT = 900
+
+# Si una revalidación falla, se reintenta después de este tiempo (sin dejar de servir lo viejo)
+REINTENTO = 60
+
+_lock = threading.Lock()
+_pendientes = set()
+_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="refresher")
+
+
+def frescura(fuente: str) -> float:
+    """Segundos de frescura para una fuente ("bcra:27", "cotizaciones", "yfinance", ...)."""
+    if fuente in POLITICAS_FRESCURA:
+        return POLITICAS_FRESCURA[fuente]
+    return POLITICAS_FRESCURA.get(fuente.split(":")[0], FRESCURA_DEFAULT)
+
+
+def programar(clave, tarea) -> bool:
+    """Encola `tarea()` en segundo plano. Si ya hay una revalidación pendiente para
+    `clave` no hace nada y devuelve False."""
+    with _lock:
+        if clave in _pendientes:
+            return False
+        _pendientes.add(clave)
+
+    def _correr():
+        try:
+            tarea()
+        except Exception:
+            logger.exception("Falló la revalidación de %s", clave)
+        finally:
+            with _lock:
+                _pendientes.discard(clave)
+
+    _pool.submit(_correr)
+    return True
+
+
+def pendientes() -> int:
+    with _lock:
+        return len(_pendientes)
@@ -0,0 +1,334 @@
+# replay_server.py
+"""Grabación y replay de las APIs que usa data_fetching, para medir y probar sin internet.
+
+Uso:
+    python replay_server.py grabar --dir fixtures --desde 2003-01-01
+    python replay_server.py sinteticos --dir fixtures --desde 2005-01-01
+    python replay_server.py servir --dir fixtures --puerto 8765 --latencia 0.08 --page-size 1000
+
+y luego, para que la app (o los benchmarks) usen el servidor local:
+    BCRA_API_BASE=http://127.0.0.1:8765 BLUELYTICS_API_BASE=http://127.0.0.1:8765 \\
+    YAHOO_API_BASE=http://127.0.0.1:8765 streamlit run app.py
+
+Con alguna de esas variables definida, el cache local (series, cierres, catálogo, blue) va
+a una subcarpeta propia de MONITOR_CACHE_DIR (.cache/origen-<id>) y las claves del cache
+compartido llevan el mismo id (ver series_store.ORIGEN): los datos del replay no se
+mezclan con los de las APIs reales.
+"""
+
+import os
+import gzip
+import json
+import hashlib
+import time
+import random
+import argparse
+import datetime
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import numpy as np
+
+# Lo que se graba / sirve
+VARIABLES_BCRA = [1, 27, 160]
+MONEDAS = ["USD", "CNY"]
+TICKERS = ["^MERV", "YPFD.BA", "GGAL.BA", "BMA.BA", "MELI.BA"]
+
+
+# --- Archivos de fixtures ---
+
+def _archivo_monetaria(directorio, id_variable):
+    return os.path.join(directorio, f"bcra_monetarias_{id_variable}.json")
+
+def _archivo_catalogo(directorio):
+    return os.path.join(directorio, "bcra_monetarias.json")
+
+def _archivo_cotizaciones(directorio, moneda):
+    return os.path.join(directorio, f"cotizaciones_{moneda}.json")
+
+def _archivo_bluelytics(directorio):
+    return os.path.join(directorio, "bluelytics_evolution.json")
+
+def _archivo_yahoo(directorio, ticker):
+    return os.path.join(directorio, f"yahoo_{ticker.replace('^', '_')}.json")
+
+
+def _guardar_json(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+
+def _leer_json(path, default=None):
+    if not os.path.exists(path):
+        return default
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+# --- Grabación desde las APIs reales ---
+
+def grabar(directorio: str, desde: str, hasta: str) -> None:
+    """Descarga las respuestas reales de todas las fuentes y las guarda como fixtures."""
+    import yfinance as yf
+    import http_client
+    import data_fetching
+
+    os.makedirs(directorio, exist_ok=True)
+
+    catalogo = http_client.get(data_fetching.BCRA_MONETARIAS_BASE, verify=False).json().get("results", [])
+    _guardar_json(_archivo_catalogo(directorio), catalogo)
+    print(f"catálogo bcra: {len(catalogo)} variables")
+
+    for id_variable in VARIABLES_BCRA:
+        url = f"{data_fetching.BCRA_MONETARIAS_BASE}/{id_variable}"
+        registros, offset = [], 0
+        while True:
+            params = {"desde": desde, "hasta": hasta, "limit": 3000, "offset": offset}
+            chunk = http_client.get(url, params=params, verify=False).json().get("results", [])
+            registros.extend(chunk)
+            if len(chunk) < 3000:
+                break
+            offset += 3000
+        _guardar_json(_archivo_monetaria(directorio, id_variable), registros)
+        print(f"bcra {id_variable}: {len(registros)} registros")
+
+    for moneda in MONEDAS:
+        url = f"{data_fetching.BCRA_COTIZACIONES_BASE}/{moneda}"
+        # la API de cotizaciones devuelve hasta 1000 registros por pedido: grabo de a un año
+        registros = []
+        inicio = datetime.date.fromisoformat(desde)
+        fin = datetime.date.fromisoformat(hasta)
+        while inicio <= fin:
+            tramo_fin = min(fin, inicio + datetime.timedelta(days=364))
+            params = {"fechadesde": inicio.isoformat(), "fechahasta": tramo_fin.isoformat(), "limit": 1000}
+            registros.extend(http_client.get(url, params=params, verify=False).json().get("results", []))
+            inicio = tramo_fin + datetime.timedelta(days=1)
+        _guardar_json(_archivo_cotizaciones(directorio, moneda), registros)
+        print(f"cotizaciones {moneda}: {len(registros)} registros")
+
+    data = http_client.get(data_fetching.BLUELYTICS_EVOLUTION_URL).json()
+    _guardar_json(_archivo_bluelytics(directorio), data)
+    print(f"bluelytics: {len(data)} registros")
+
+    closes = yf.download(TICKERS, start=desde, end=hasta)["Close"]
+    for ticker in TICKERS:
+        serie = closes[ticker].dropna()
+        _guardar_json(
+            _archivo_yahoo(directorio, ticker),
+            [[d.strftime("%Y-%m-%d"), float(v)] for d, v in serie.items()],
+        )
+        print(f"yahoo {ticker}: {len(serie)} cierres")
+
+
+# --- Datos sintéticos con el mismo formato ---
+
+def generar_sinteticos(directorio: str, desde: str, hasta: str, semilla: int = 0) -> None:
+    """Genera fixtures sintéticos (caminatas aleatorias) con el formato de cada API."""
+    rng = np.random.default_rng(semilla)
+    os.makedirs(directorio, exist_ok=True)
+
+    dias = np.arange(np.datetime64(desde), np.datetime64(hasta) + 1)
+    habiles = dias[np.is_busday(dias)]
+    fechas = [str(d) for d in dias]
+    fechas_habiles = [str(d) for d in habiles]
+
+    def _camino(n, inicio, vol):
+        return inicio * np.exp(np.cumsum(rng.normal(0.0005, vol, n)))
+
+    # reservas (diaria), TPM (diaria, escalonada), inflación (mensual)
+    reservas = _camino(len(fechas), 30000, 0.004)
+    tpm = np.round(np.repeat(_camino(len(fechas) // 30 + 1, 40, 0.05), 30)[:len(fechas)], 1)
+    meses = [str(m) for m in np.arange(np.datetime64(desde, "M"), np.datetime64(hasta, "M") + 1)]
+    fin_de_mes = [str(np.datetime64(m, "M") + 1 - np.timedelta64(1, "D")) for m in meses]
+    inflacion = np.round(np.abs(rng.normal(4, 2, len(meses))), 1)
+
+    for id_variable, fs, vs in [(1, fechas, reservas), (160, fechas, tpm), (27, fin_de_mes, inflacion)]:
+        registros = [{"idVariable": id_variable, "fecha": f, "valor": float(round(v, 2))} for f, v in zip(fs, vs)]
+        _guardar_json(_archivo_monetaria(directorio, id_variable), registros[::-1])
+
+    descripciones = {
+        1: "Reservas Internacionales del BCRA (en millones de dólares - cifras provisorias sujetas a cambio de valuación)",
+        160: "Tasa de Política Monetaria (en % n.a.)",
+        27: "Inflación mensual (variación en %)",
+    }
+    _guardar_json(_archivo_catalogo(directorio), [
+        {"idVariable": id_variable, "descripcion": d, "categoria": "Principales Variables"}
+        for id_variable, d in descripciones.items()
+    ])
+
+    usd = _camino(len(fechas_habiles), 100, 0.01)
+    cny = usd / 7.1
+    for moneda, serie in [("USD", usd), ("CNY", cny)]:
+        registros = [
+            {"fecha": f, "detalle": [{"codigoMoneda": moneda, "tipoCotizacion": float(round(v, 4))}]}
+            for f, v in zip(fechas_habiles, serie)
+        ]
+        _guardar_json(_archivo_cotizaciones(directorio, moneda), registros)
+
+    blue = usd * 1.4
+    evolution = []
+    for f, oficial, b in zip(fechas_habiles, usd, blue):
+        evolution.append({"date": f, "source": "Oficial", "value_sell": round(oficial * 1.02, 2), "value_buy": round(oficial * 0.98, 2)})
+        evolution.append({"date": f, "source": "Blue", "value_sell": round(b * 1.02, 2), "value_buy": round(b * 0.98, 2)})
+    _guardar_json(_archivo_bluelytics(directorio), evolution[::-1])
+
+    for ticker in TICKERS:
+        serie = _camino(len(fechas_habiles), 1000, 0.02)
+        _guardar_json(_archivo_yahoo(directorio, ticker), [[f, float(v)] for f, v in zip(fechas_habiles, serie)])
+
+
+# --- Servidor de replay ---
+
+class _Fixtures:
+    """Carga perezosa (y thread-safe) de los fixtures de un directorio."""
+
+    def __init__(self, directorio):
+        self.directorio = directorio
+        self._lock = threading.Lock()
+        self._cache = {}
+
+    def leer(self, path):
+        with self._lock:
+            if path not in self._cache:
+                self._cache[path] = _leer_json(path)
+            return self._cache[path]
+
+
+def _crear_handler(fixtures: _Fixtures, latencia: float, page_size: int):
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _responder(self, codigo, payload):
+            body = json.dumps(payload).encode("utf-8")
+            # como las APIs reales: ETag para pedidos condicionales y gzip si el cliente lo acepta
+            etag = f'"{hashlib.sha1(body).hexdigest()[:16]}"'
+            if codigo == 200 and self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            gz = "gzip" in self.headers.get("Accept-Encoding", "")
+            if gz:
+                body = gzip.compress(body, compresslevel=5)
+            self.send_response(codigo)
+            self.send_header("Content-Type", "application/json")
+            if codigo == 200:
+                self.send_header("ETag", etag)
+            if gz:
+                self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if latencia:
+                time.sleep(random.uniform(0.5 * latencia, 1.5 * latencia))
+            url = urlparse(self.path)
+            q = {k: v[0] for k, v in parse_qs(url.query).items()}
+            partes = url.path.strip("/").split("/")
+
+            if url.path.rstrip("/") == "/estadisticas/v3.0/monetarias":
+                data = fixtures.leer(_archivo_catalogo(fixtures.directorio))
+                return self._responder(200, {"status": 200, "results": data}) if data is not None else self._responder(404, [])
+            if url.path.startswith("/estadisticas/v3.0/monetarias/"):
+                return self._monetarias(partes[-1], q)
+            if url.path.startswith("/estadisticascambiarias/v1.0/Cotizaciones/"):
+                return self._cotizaciones(partes[-1], q)
+            if url.path == "/v2/evolution.json":
+                data = fixtures.leer(_archivo_bluelytics(fixtures.directorio))
+                return self._responder(200, data) if data is not None else self._responder(404, [])
+            if url.path == "/yahoo/close":
+                return self._yahoo(q)
+            self._responder(404, {"status": 404, "errorMessages": [f"Ruta desconocida: {url.path}"]})
+
+        def _monetarias(self, id_variable, q):
+            data = fixtures.leer(_archivo_monetaria(fixtures.directorio, id_variable))
+            if data is None:
+                return self._responder(404, {"status": 404, "errorMessages": ["Variable inexistente"]})
+            desde, hasta = q.get("desde", "0000-00-00"), q.get("hasta", "9999-99-99")
+            filas = [x for x in data if desde <= x["fecha"] <= hasta]
+            limit = min(int(q.get("limit", 1000)), page_size)
+            offset = int(q.get("offset", 0))
+            self._responder(200, {
+                "status": 200,
+                "metadata": {"resultset": {"count": len(filas), "offset": offset, "limit": limit}},
+                "results": filas[offset:offset + limit],
+            })
+
+        def _cotizaciones(self, moneda, q):
+            data = fixtures.leer(_archivo_cotizaciones(fixtures.directorio, moneda)) or []
+            desde, hasta = q.get("fechadesde", "0000-00-00"), q.get("fechahasta", "9999-99-99")
+            filas = [x for x in data if desde <= x["fecha"] <= hasta]
+            limit = int(q.get("limit", 1000))
+            offset = int(q.get("offset", 0))
+            self._responder(200, {
+                "status": 200,
+                "metadata": {"resultset": {"count": len(filas), "offset": offset, "limit": limit}},
+                "results": filas[offset:offset + limit],
+            })
+
+        def _yahoo(self, q):
+            start, end = q.get("start", "0000-00-00"), q.get("end", "9999-99-99")
+            salida = {}
+            for ticker in q.get("tickers", "").split(","):
+                data = fixtures.leer(_archivo_yahoo(fixtures.directorio, ticker)) or []
+                # como yfinance: fin exclusivo
+                salida[ticker] = [x for x in data if start <= x[0] < end]
+            self._responder(200, salida)
+
+    return Handler
+
+
+def crear_servidor(directorio: str, host: str = "127.0.0.1", puerto: int = 8765,
+                   latencia: float = 0.0, page_size: int = 3000) -> ThreadingHTTPServer:
+    """Crea (sin arrancar) el servidor de replay sobre los fixtures de `directorio`."""
+    handler = _crear_handler(_Fixtures(directorio), latencia, page_size)
+    servidor = ThreadingHTTPServer((host, puerto), handler)
+    servidor.daemon_threads = True
+    return servidor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="comando", required=True)
+    hoy = datetime.date.today().isoformat()
+
+    p = sub.add_parser("grabar", help="graba respuestas reales como fixtures")
+    p.add_argument("--dir", default="fixtures")
+    p.add_argument("--desde", default="2003-01-01")
+    p.add_argument("--hasta", default=hoy)
+
+    p = sub.add_parser("sinteticos", help="genera fixtures sintéticos")
+    p.add_argument("--dir", default="fixtures")
+    p.add_argument("--desde", default="2005-01-01")
+    p.add_argument("--hasta", default=hoy)
+    p.add_argument("--semilla", type=int, default=0)
+
+    p = sub.add_parser("servir", help="sirve los fixtures imitando las APIs")
+    p.add_argument("--dir", default="fixtures")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--puerto", type=int, default=8765)
+    p.add_argument("--latencia", type=float, default=0.0, help="latencia media por pedido (segundos)")
+    p.add_argument("--page-size", type=int, default=3000, help="máximo de registros por página en /monetarias")
+
+    args = parser.parse_args()
+    if args.comando == "grabar":
+        grabar(args.dir, args.desde, args.hasta)
+    elif args.comando == "sinteticos":
+        generar_sinteticos(args.dir, args.desde, args.hasta, args.semilla)
+    else:
+        servidor = crear_servidor(args.dir, args.host, args.puerto, args.latencia, args.page_size)
+        print(f"Sirviendo {args.dir} en http://{args.host}:{args.puerto} (Ctrl+C para salir)")
+        try:
+            servidor.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
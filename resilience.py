@@ -0,0 +1,174 @@
+# resilience.py
+"""Resiliencia frente a APIs lentas o caídas, por host de origen.
+
+- Plazo por host: tiempo total (con reintentos) que se le da a cada pedido (http_client y
+  llamar() para lo que no pasa por HTTP propio, como yfinance).
+- Interruptor (circuit breaker): después de FALLOS_PARA_ABRIR fallas seguidas el host se
+  deja de llamar durante ENFRIAMIENTO segundos; pasado ese tiempo se deja pasar un único
+  pedido de prueba y, según cómo le vaya, se cierra o se vuelve a abrir.
+- Respaldo: mientras un host falla se sirve el último dato bueno (el que ya está en disco,
+  en series_store, o en memoria, en range_cache) y se marca como desactualizado con
+  marcar_desactualizado(). Las marcas se juntan con registro() y llegan hasta el panel
+  (ver fetch_orchestrator).
+"""
+
+import os
+import time
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from contextlib import contextmanager
+
+FALLOS_PARA_ABRIR = int(os.environ.get("MONITOR_FALLOS_PARA_ABRIR", 3))
+ENFRIAMIENTO = float(os.environ.get("MONITOR_ENFRIAMIENTO", 60))
+
+# Plazo total (segundos) por host; se pisa con MONITOR_PLAZOS="host=segundos,host=segundos"
+PLAZOS = {
+    "api.bcra.gob.ar": 25,
+    "api.bluelytics.com.ar": 8,
+    "yahoo": 30,
+}
+PLAZO_DEFAULT = 20
+for _par in filter(None, os.environ.get("MONITOR_PLAZOS", "").split(",")):
+    _host, _, _segundos = _par.partition("=")
+    PLAZOS[_host.strip()] = float(_segundos)
+
+
+class CircuitoAbierto(Exception):
+    """El host está fallando y no se lo llama hasta que termine el enfriamiento."""
+
+    def __init__(self, host: str, segundos: float):
+        super().__init__(f"{host} no responde; se reintenta en {segundos:.0f} s")
+        self.host = host
+
+
+class Interruptor:
+    """Estado del circuit breaker de un host (cerrado / abierto / semiabierto)."""
+
+    def __init__(self, host: str):
+        self.host = host
+        self._lock = threading.Lock()
+        self.fallos = 0
+        self.abierto_hasta = 0.0   # 0 = cerrado
+        self._prueba = False
+        self.ultimo_ok = None      # time.time() del último pedido bueno
+
+    @property
+    def estado(self) -> str:
+        if not self.abierto_hasta:
+            return "cerrado"
+        return "abierto" if time.monotonic() < self.abierto_hasta else "semiabierto"
+
+    def permitir(self) -> None:
+        """Lanza CircuitoAbierto si no se puede llamar al host ahora. Si pasa, el llamador
+        tiene que terminar con exito(), fallo() o soltar()."""
+        with self._lock:
+            if not self.abierto_hasta:
+                return
+            restante = self.abierto_hasta - time.monotonic()
+            if restante > 0 or self._prueba:
+                raise CircuitoAbierto(self.host, max(restante, 0))
+            self._prueba = True
+
+    def exito(self) -> None:
+        with self._lock:
+            self.fallos = 0
+            self.abierto_hasta = 0.0
+            self._prueba = False
+            self.ultimo_ok = time.time()
+
+    def fallo(self) -> None:
+        with self._lock:
+            self.fallos += 1
+            self._prueba = False
+            if self.fallos >= FALLOS_PARA_ABRIR or self.abierto_hasta:
+                self.abierto_hasta = time.monotonic() + ENFRIAMIENTO
+
+    def soltar(self) -> None:
+        """Termina un pedido sin veredicto (p. ej. un error que no es del host)."""
+        with self._lock:
+            self._prueba = False
+
+
+_lock = threading.Lock()
+_interruptores = {}
+_pools = {}
+
+
+def interruptor(host: str) -> Interruptor:
+    with _lock:
+        if host not in _interruptores:
+            _interruptores[host] = Interruptor(host)
+        return _interruptores[host]
+
+
+def plazo(host: str) -> float:
+    return PLAZOS.get(host, PLAZO_DEFAULT)
+
+
+def estado() -> list[dict]:
+    """Una fila por host con el estado del interruptor (para el panel de debug)."""
+    with _lock:
+        interruptores = list(_interruptores.values())
+    return [
+        {
+            "host": i.host,
+            "estado": i.estado,
+            "fallos": i.fallos,
+            "ultimo_ok": time.strftime("%H:%M:%S", time.localtime(i.ultimo_ok)) if i.ultimo_ok else None,
+        }
+        for i in interruptores
+    ]
+
+
+def llamar(host: str, fn, *args, **kwargs):
+    """fn(*args, **kwargs) con el interruptor y el plazo de `host`, para llamadas bloqueantes
+    que no pasan por http_client (yfinance).
+
+    Corre en un worker propio del host (uno solo: además serializa las llamadas); si se
+    vence el plazo se devuelve TimeoutError y la llamada sigue en segundo plano.
+    """
+    inter = interruptor(host)
+    inter.permitir()
+    with _lock:
+        if host not in _pools:
+            _pools[host] = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"plazo-{host}")
+        pool = _pools[host]
+    futuro = pool.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+    try:
+        resultado = futuro.result(timeout=plazo(host))
+    except FuturesTimeout:
+        inter.fallo()
+        raise TimeoutError(f"{host} no respondió en {plazo(host):.0f} s") from None
+    except Exception:
+        inter.fallo()
+        raise
+    inter.exito()
+    return resultado
+
+
+# --- Marcas de datos desactualizados ---
+
+_marcas = contextvars.ContextVar("datos_desactualizados", default=None)
+
+
+@contextmanager
+def registro():
+    """Junta las marcas de marcar_desactualizado() hechas adentro: {host: último ok (o None)}.
+    Las marcas también se pasan al registro de afuera, si lo hay."""
+    marcas = {}
+    externo = _marcas.get()
+    token = _marcas.set(marcas)
+    try:
+        yield marcas
+    finally:
+        _marcas.reset(token)
+        if externo is not None:
+            externo.update(marcas)
+
+
+def marcar_desactualizado(host: str, ultimo_ok: float | None = None) -> None:
+    """Indica que lo que se está devolviendo es el último dato bueno de `host`, no uno nuevo."""
+    marcas = _marcas.get()
+    if marcas is not None:
+        marcas[host] = ultimo_ok if ultimo_ok is not None else interruptor(host).ultimo_ok
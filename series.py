@@ -0,0 +1,79 @@
+# series.py
+
+import numpy as np
+import pandas as pd
+
+
+def _solo_lectura(arr: np.ndarray) -> np.ndarray:
+    arr = np.ascontiguousarray(arr)
+    arr.setflags(write=False)
+    return arr
+
+
+class SerieCompacta:
+    """Serie normalizada para cachear: fechas ordenadas + columnas numéricas float64.
+
+    - Las columnas no numéricas con un único valor (p. ej. idVariable) se guardan como
+      constante; las demás no numéricas, como categóricas.
+    - Los arrays son de solo lectura y se comparten: recortar() arma DataFrames que
+      apuntan a los mismos datos en todas las sesiones, sin copiar.
+    """
+
+    __slots__ = ("fechas", "columnas", "constantes", "orden")
+
+    def __init__(self, fechas, columnas: dict, constantes: dict, orden: list):
+        self.fechas = fechas
+        self.columnas = columnas
+        self.constantes = constantes
+        self.orden = orden
+
+    @classmethod
+    def desde_df(cls, df: pd.DataFrame) -> "SerieCompacta":
+        """Normaliza un DataFrame con columna 'fecha' (lo ordena por fecha)."""
+        df = df.sort_values("fecha", kind="stable")
+        fechas = _solo_lectura(df["fecha"].to_numpy("datetime64[ns]"))
+        columnas, constantes = {}, {}
+        for col in df.columns:
+            if col == "fecha":
+                continue
+            s = df[col]
+            if pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s):
+                if s.nunique(dropna=False) == 1 and pd.api.types.is_integer_dtype(s):
+                    constantes[col] = s.iloc[0]
+                else:
+                    columnas[col] = _solo_lectura(s.to_numpy(np.float64, na_value=np.nan))
+            elif len(s) and s.nunique(dropna=False) == 1:
+                constantes[col] = s.iloc[0]
+            else:
+                columnas[col] = pd.Categorical(s)
+        return cls(fechas, columnas, constantes, list(df.columns))
+
+    def __len__(self) -> int:
+        return len(self.fechas)
+
+    @property
+    def nbytes(self) -> int:
+        total = self.fechas.nbytes
+        for arr in self.columnas.values():
+            total += arr.nbytes
+        return total
+
+    def a_df(self, i: int = 0, j: int | None = None) -> pd.DataFrame:
+        """DataFrame con las filas [i, j) en el orden de columnas original (vistas, sin copiar)."""
+        datos = {}
+        n = len(self.fechas[i:j])
+        for col in self.orden:
+            if col == "fecha":
+                datos[col] = self.fechas[i:j]
+            elif col in self.constantes:
+                valor = self.constantes[col]
+                datos[col] = np.full(n, valor, dtype=object if isinstance(valor, str) else None)
+            else:
+                datos[col] = self.columnas[col][i:j]
+        return pd.DataFrame(datos, copy=False)
+
+    def recortar(self, desde: str, hasta: str) -> pd.DataFrame:
+        """Filas con fecha en [desde, hasta] usando búsqueda binaria sobre las fechas."""
+        i = self.fechas.searchsorted(np.datetime64(pd.Timestamp(desde), "ns"), side="left")
+        j = self.fechas.searchsorted(np.datetime64(pd.Timestamp(hasta), "ns"), side="right")
+        return self.a_df(i, j)
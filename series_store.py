@@ -0,0 +1,346 @@
+# series_store.py
+
+import os
+import hashlib
+import sqlite3
+import threading
+import datetime
+import pandas as pd
+
+# APIs que se pueden redirigir (p. ej. a replay_server.py) con variables de entorno
+VARIABLES_ORIGEN = ("BCRA_API_BASE", "BLUELYTICS_API_BASE", "YAHOO_API_BASE")
+
+
+def _origen() -> str:
+    """Id corto de las URLs de las APIs redirigidas, o "" si se usan las reales."""
+    redirigidas = [f"{v}={os.environ[v].rstrip('/')}" for v in VARIABLES_ORIGEN if os.environ.get(v)]
+    if not redirigidas:
+        return ""
+    return hashlib.sha1("\n".join(redirigidas).encode()).hexdigest()[:10]
+
+
+# Identifica de dónde vienen los datos cacheados (también entra en las claves de cache_backend)
+ORIGEN = _origen()
+
+# Carpeta del cache local (se puede cambiar con la variable de entorno MONITOR_CACHE_DIR).
+# Con alguna API redirigida se usa una subcarpeta por origen: lo descargado del servidor
+# de replay (datos sintéticos) nunca queda como "cubierto" para las APIs reales.
+CACHE_DIR = os.environ.get("MONITOR_CACHE_DIR", ".cache")
+if ORIGEN:
+    CACHE_DIR = os.path.join(CACHE_DIR, f"origen-{ORIGEN}")
+DB_PATH = os.path.join(CACHE_DIR, "series.sqlite")
+
+_lock = threading.Lock()
+_conn = None
+
+
+def _conectar() -> sqlite3.Connection:
+    """Abre (una sola vez por proceso) la base SQLite y crea las tablas si no existen."""
+    global _conn
+    if _conn is None:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS bcra_valores (
+                id_variable INTEGER NOT NULL,
+                fecha       TEXT    NOT NULL,
+                valor       REAL,
+                PRIMARY KEY (id_variable, fecha)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS bcra_cobertura (
+                id_variable INTEGER NOT NULL,
+                desde       TEXT    NOT NULL,
+                hasta       TEXT    NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS cotizaciones_valores (
+                moneda TEXT NOT NULL,
+                fecha  TEXT NOT NULL,
+                valor  REAL,
+                PRIMARY KEY (moneda, fecha)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS cotizaciones_cobertura (
+                moneda TEXT NOT NULL,
+                desde  TEXT NOT NULL,
+                hasta  TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS yahoo_cierres (
+                ticker TEXT NOT NULL,
+                fecha  TEXT NOT NULL,
+                cierre REAL,
+                PRIMARY KEY (ticker, fecha)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS yahoo_cobertura (
+                ticker TEXT PRIMARY KEY,
+                desde  TEXT NOT NULL,
+                hasta  TEXT NOT NULL
+            );
+            -- versión anterior de blue_valores, sin url (era solo cache)
+            DROP TABLE IF EXISTS usd_blue;
+            CREATE TABLE IF NOT EXISTS blue_valores (
+                url   TEXT NOT NULL,
+                fecha TEXT NOT NULL,
+                valor REAL,
+                PRIMARY KEY (url, fecha)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS validadores (
+                url           TEXT PRIMARY KEY,
+                etag          TEXT,
+                last_modified TEXT
+            );
+        """)
+        _conn = conn
+    return _conn
+
+
+def _dia(d: str) -> datetime.date:
+    return datetime.date.fromisoformat(d)
+
+
+def _unir_rangos(rangos: list[tuple[str, str]]) -> list[tuple[str, str]]:
+    """Ordena y fusiona rangos [desde, hasta] que se superponen o son contiguos."""
+    unidos = []
+    for desde, hasta in sorted(rangos):
+        if unidos and _dia(desde) <= _dia(unidos[-1][1]) + datetime.timedelta(days=1):
+            if hasta > unidos[-1][1]:
+                unidos[-1] = (unidos[-1][0], hasta)
+        else:
+            unidos.append((desde, hasta))
+    return unidos
+
+
+# Series con cobertura por rangos: familia -> (tabla de valores, tabla de cobertura, columna clave)
+_TABLAS = {
+    "bcra": ("bcra_valores", "bcra_cobertura", "id_variable"),
+    "cotizacion": ("cotizaciones_valores", "cotizaciones_cobertura", "moneda"),
+}
+
+
+def _cobertura(conn, clave, familia: str = "bcra") -> list[tuple[str, str]]:
+    _, cobertura, columna = _TABLAS[familia]
+    cur = conn.execute(
+        f"SELECT desde, hasta FROM {cobertura} WHERE {columna} = ? ORDER BY desde",
+        (clave,),
+    )
+    return [(d, h) for d, h in cur.fetchall()]
+
+
+def rangos_faltantes(id_variable: int, desde: str, hasta: str, familia: str = "bcra") -> list[tuple[str, str]]:
+    """Devuelve los tramos de [desde, hasta] (YYYY-MM-DD) que todavía no están en el cache."""
+    with _lock:
+        cubiertos = _cobertura(_conectar(), id_variable, familia)
+
+    faltantes = []
+    cursor = _dia(desde)
+    fin = _dia(hasta)
+    for c_desde, c_hasta in cubiertos:
+        c_desde, c_hasta = _dia(c_desde), _dia(c_hasta)
+        if c_hasta < cursor:
+            continue
+        if c_desde > fin:
+            break
+        if c_desde > cursor:
+            faltantes.append((cursor.isoformat(), (c_desde - datetime.timedelta(days=1)).isoformat()))
+        cursor = max(cursor, c_hasta + datetime.timedelta(days=1))
+        if cursor > fin:
+            break
+    if cursor <= fin:
+        faltantes.append((cursor.isoformat(), fin.isoformat()))
+    return faltantes
+
+
+def guardar(id_variable: int, df: pd.DataFrame, desde: str, hasta: str) -> None:
+    """Guarda los valores descargados para [desde, hasta] y actualiza la cobertura.
+
+    Lo posterior al último dato publicado no se marca como cubierto: ese tramo
+    (la "cola" de la serie) se vuelve a pedir en la próxima carga.
+    """
+    _guardar("bcra", id_variable, df, "valor", desde, hasta)
+
+
+def _guardar(familia: str, clave, df: pd.DataFrame, columna_valor: str, desde: str, hasta: str) -> None:
+    valores_tabla, cobertura, columna = _TABLAS[familia]
+    filas = []
+    if not df.empty and "fecha" in df.columns and columna_valor in df.columns:
+        validos = df.dropna(subset=["fecha"])
+        fechas = pd.to_datetime(validos["fecha"]).dt.strftime("%Y-%m-%d")
+        valores = pd.to_numeric(validos[columna_valor], errors="coerce").astype(object)
+        valores = valores.where(valores.notna(), None)
+        filas = list(zip([clave] * len(fechas), fechas, valores))
+
+    with _lock:
+        conn = _conectar()
+        with conn:
+            if filas:
+                conn.executemany(
+                    f"INSERT OR REPLACE INTO {valores_tabla} ({columna}, fecha, valor) VALUES (?, ?, ?)",
+                    filas,
+                )
+            (ultima,) = conn.execute(
+                f"SELECT MAX(fecha) FROM {valores_tabla} WHERE {columna} = ?", (clave,)
+            ).fetchone()
+            if ultima is None or ultima < desde:
+                return
+            cubierto_hasta = hasta if hasta <= ultima else ultima
+
+            rangos = _unir_rangos(_cobertura(conn, clave, familia) + [(desde, cubierto_hasta)])
+            conn.execute(f"DELETE FROM {cobertura} WHERE {columna} = ?", (clave,))
+            conn.executemany(
+                f"INSERT INTO {cobertura} ({columna}, desde, hasta) VALUES (?, ?, ?)",
+                [(clave, d, h) for d, h in rangos],
+            )
+
+
+def leer(id_variable: int, desde: str, hasta: str) -> pd.DataFrame:
+    """Lee del cache la serie en [desde, hasta] con el mismo formato que devuelve la API."""
+    with _lock:
+        cur = _conectar().execute(
+            "SELECT fecha, valor FROM bcra_valores "
+            "WHERE id_variable = ? AND fecha BETWEEN ? AND ? ORDER BY fecha",
+            (id_variable, desde, hasta),
+        )
+        filas = cur.fetchall()
+
+    if not filas:
+        return pd.DataFrame()
+    df = pd.DataFrame(filas, columns=["fecha", "valor"])
+    df.insert(0, "idVariable", id_variable)
+    df["fecha"] = pd.to_datetime(df["fecha"])
+    df["valor"] = pd.to_numeric(df["valor"], errors="coerce")
+    return df
+
+
+# --- Cotizaciones oficiales del BCRA (USD, CNY), con la misma cobertura por rangos ---
+
+def rangos_faltantes_cotizacion(moneda: str, desde: str, hasta: str) -> list[tuple[str, str]]:
+    return rangos_faltantes(moneda, desde, hasta, familia="cotizacion")
+
+
+def guardar_cotizacion(moneda: str, df: pd.DataFrame, columna: str, desde: str, hasta: str) -> None:
+    """Guarda la cotización (columnas 'fecha' y `columna`) descargada para [desde, hasta]."""
+    _guardar("cotizacion", moneda, df, columna, desde, hasta)
+
+
+def leer_cotizacion(moneda: str, columna: str, desde: str, hasta: str) -> pd.DataFrame:
+    """Cotización guardada en [desde, hasta]: columnas 'fecha' y `columna` (vacía si no hay nada)."""
+    with _lock:
+        filas = _conectar().execute(
+            "SELECT fecha, valor FROM cotizaciones_valores "
+            "WHERE moneda = ? AND fecha BETWEEN ? AND ? AND valor IS NOT NULL ORDER BY fecha",
+            (moneda, desde, hasta),
+        ).fetchall()
+    df = pd.DataFrame(filas, columns=["fecha", columna])
+    df["fecha"] = pd.to_datetime(df["fecha"]).astype("datetime64[ns]")
+    df[columna] = df[columna].astype(float)
+    return df
+
+
+# --- Cierres de Yahoo Finance (ver market_data.py) ---
+# La cobertura de cada ticker es un único rango contiguo: market_data solo pide tramos
+# pegados a lo ya guardado (historia anterior o días nuevos).
+
+def cobertura_cierres(tickers: list[str]) -> dict[str, tuple[str, str]]:
+    """Rango [desde, hasta] ya guardado de cada ticker (los que no tienen nada no aparecen)."""
+    with _lock:
+        cur = _conectar().execute(
+            f"SELECT ticker, desde, hasta FROM yahoo_cobertura WHERE ticker IN ({','.join('?' * len(tickers))})",
+            list(tickers),
+        )
+        return {t: (d, h) for t, d, h in cur.fetchall()}
+
+
+def guardar_cierres(ticker: str, cierres: pd.Series, desde: str, hasta: str) -> None:
+    """Guarda los cierres (índice de fechas) descargados para [desde, hasta] y extiende la cobertura.
+
+    Como en guardar(), la cobertura no pasa del último cierre guardado. Una descarga vacía
+    no cambia nada (yfinance devuelve vacío también cuando falla).
+    """
+    cierres = cierres.dropna()
+    if cierres.empty:
+        return
+    filas = list(zip(
+        [ticker] * len(cierres),
+        pd.to_datetime(cierres.index).strftime("%Y-%m-%d"),
+        cierres.astype(float).tolist(),
+    ))
+    with _lock:
+        conn = _conectar()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO yahoo_cierres (ticker, fecha, cierre) VALUES (?, ?, ?)", filas
+            )
+            (ultima,) = conn.execute("SELECT MAX(fecha) FROM yahoo_cierres WHERE ticker = ?", (ticker,)).fetchone()
+            cubierto_hasta = min(hasta, ultima)
+            if cubierto_hasta < desde:
+                return
+            previo = conn.execute("SELECT desde, hasta FROM yahoo_cobertura WHERE ticker = ?", (ticker,)).fetchone()
+            if previo is not None:
+                desde, cubierto_hasta = min(desde, previo[0]), max(cubierto_hasta, previo[1])
+            conn.execute(
+                "INSERT OR REPLACE INTO yahoo_cobertura (ticker, desde, hasta) VALUES (?, ?, ?)",
+                (ticker, desde, cubierto_hasta),
+            )
+
+
+def leer_cierres(tickers: list[str], desde: str, hasta: str) -> pd.DataFrame:
+    """Cierres en [desde, hasta]: columna 'fecha' y una columna por ticker (en el orden pedido)."""
+    with _lock:
+        cur = _conectar().execute(
+            "SELECT fecha, ticker, cierre FROM yahoo_cierres "
+            f"WHERE ticker IN ({','.join('?' * len(tickers))}) AND fecha BETWEEN ? AND ?",
+            [*tickers, desde, hasta],
+        )
+        filas = cur.fetchall()
+
+    df = pd.DataFrame(filas, columns=["fecha", "ticker", "cierre"])
+    df = df.pivot(index="fecha", columns="ticker", values="cierre").reindex(columns=list(tickers))
+    df.index = pd.to_datetime(df.index)
+    df.columns.name = None
+    return df.sort_index().rename_axis("fecha").reset_index()
+
+
+# --- USD blue de bluelytics ---
+# evolution.json trae siempre la historia completa: se guarda solo la serie del blue ya
+# procesada, junto con el ETag / Last-Modified de la respuesta para pedidos condicionales.
+# Serie y validadores van por URL: un 304 solo puede devolver lo que bajó de esa misma URL.
+
+def validadores(url: str) -> tuple[str | None, str | None] | None:
+    """(ETag, Last-Modified) de la última respuesta guardada de `url`, o None."""
+    with _lock:
+        fila = _conectar().execute(
+            "SELECT etag, last_modified FROM validadores WHERE url = ?", (url,)
+        ).fetchone()
+    return tuple(fila) if fila else None
+
+
+def guardar_usd_blue(df: pd.DataFrame, url: str, etag: str | None, last_modified: str | None) -> None:
+    """Reemplaza la serie del blue (fecha, usd_blue) descargada de `url` y sus validadores."""
+    filas = list(zip(pd.to_datetime(df["fecha"]).dt.strftime("%Y-%m-%d"), df["usd_blue"].astype(float).tolist()))
+    with _lock:
+        conn = _conectar()
+        with conn:
+            conn.execute("DELETE FROM blue_valores WHERE url = ?", (url,))
+            conn.executemany(
+                "INSERT OR REPLACE INTO blue_valores (url, fecha, valor) VALUES (?, ?, ?)",
+                [(url, f, v) for f, v in filas],
+            )
+            if etag or last_modified:
+                conn.execute(
+                    "INSERT OR REPLACE INTO validadores (url, etag, last_modified) VALUES (?, ?, ?)",
+                    (url, etag, last_modified),
+                )
+            else:
+                conn.execute("DELETE FROM validadores WHERE url = ?", (url,))
+
+
+def leer_usd_blue(url: str) -> pd.DataFrame:
+    """Serie del blue guardada para `url` (fecha, usd_blue); vacía si nunca se descargó."""
+    with _lock:
+        filas = _conectar().execute(
+            "SELECT fecha, valor FROM blue_valores WHERE url = ? ORDER BY fecha", (url,)
+        ).fetchall()
+    df = pd.DataFrame(filas, columns=["fecha", "usd_blue"])
+    # misma resolución que las fechas que arma decoding (pandas 3 parsea texto en µs)
+    df["fecha"] = pd.to_datetime(df["fecha"]).astype("datetime64[ns]")
+    df["usd_blue"] = df["usd_blue"].astype(float)
+    return df
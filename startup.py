@@ -0,0 +1,76 @@
+# startup.py
+"""Perfil del costo de import de cada módulo al arrancar (python -X importtime).
+
+Importa los módulos pedidos en un proceso nuevo (arranque en frío), en orden, y reporta:
+  - el costo incremental de cada uno (lo que agrega sobre los anteriores), y
+  - los paquetes que más tiempo propio suman.
+
+Uso:
+    python startup.py                           # los imports de app.py, en su orden
+    python startup.py yfinance plotly.graph_objects
+    python startup.py --top 30
+"""
+
+import os
+import re
+import sys
+import argparse
+import subprocess
+
+# Lo que importa app.py antes del primer gráfico, en el mismo orden
+MODULOS_APP = [
+    "streamlit", "data_fetching", "plotting", "fetch_orchestrator",
+    "cache_backend", "instrumentation", "resilience",
+]
+
+_LINEA = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+
+def perfil_imports(modulos: list[str]) -> tuple[list[dict], list[dict]]:
+    """Devuelve (costo por módulo pedido, tiempo propio por paquete), en microsegundos."""
+    codigo = "; ".join(f"import {m}" for m in modulos)
+    raiz = os.path.dirname(os.path.abspath(__file__))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", codigo],
+        capture_output=True, text=True, cwd=raiz,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "falló el import")
+
+    por_modulo, por_paquete = {}, {}
+    for linea in proc.stderr.splitlines():
+        m = _LINEA.match(linea)
+        if not m:
+            continue
+        propio, acumulado, sangria, nombre = int(m[1]), int(m[2]), m[3], m[4]
+        paquete = nombre.split(".")[0]
+        por_paquete[paquete] = por_paquete.get(paquete, 0) + propio
+        if not sangria and nombre in modulos:
+            por_modulo[nombre] = acumulado
+
+    filas_modulos = [{"modulo": m, "us": por_modulo.get(m, 0)} for m in modulos]
+    filas_paquetes = sorted(
+        ({"paquete": p, "us": us} for p, us in por_paquete.items()), key=lambda x: -x["us"]
+    )
+    return filas_modulos, filas_paquetes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modulos", nargs="*", default=MODULOS_APP)
+    parser.add_argument("--top", type=int, default=15, help="paquetes a listar")
+    args = parser.parse_args()
+
+    filas_modulos, filas_paquetes = perfil_imports(args.modulos)
+    total = sum(f["us"] for f in filas_modulos)
+    print("Costo incremental de cada import (ms):")
+    for f in filas_modulos:
+        print(f"  {f['modulo']:<32} {f['us'] / 1000:>9.1f}")
+    print(f"  {'total':<32} {total / 1000:>9.1f}")
+    print(f"\nPaquetes con más tiempo propio (top {args.top}, ms):")
+    for f in filas_paquetes[:args.top]:
+        print(f"  {f['paquete']:<32} {f['us'] / 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+# static_export.py
+"""Exportación estática del tablero para el rango por defecto, para servir con un servidor
+de archivos o un CDN. La app de Streamlit queda para rangos de fechas a medida.
+
+Genera en --salida:
+    index.html        el layout de app.py con las siete figuras embebidas
+    plotly.min.js     plotly.js (se cachea aparte del HTML)
+    figuras/*.json    cada figura en JSON de Plotly (para otros consumidores)
+    manifest.json     rango, fecha de generación y estado de cada panel
+
+El bundle se arma en una carpeta temporal y se publica con un rename, así el servidor nunca
+sirve una exportación a medias. Si alguna fuente falla no se pisa el bundle anterior
+(salvo --forzar) y el comando sale con código 1.
+
+Uso:
+    python static_export.py --salida public --url-app https://monitor.ejemplo.com
+    */15 * * * * cd /ruta/al/monitor && python static_export.py --salida /var/www/monitor
+"""
+
+import os
+import sys
+import json
+import html
+import shutil
+import argparse
+import datetime
+import tempfile
+
+import plotly.offline
+
+import data_fetching
+import plotting
+from fetch_orchestrator import descargar_en_paralelo
+
+# Rango por defecto de app.py: desde DESDE_DEFAULT hasta hoy
+DESDE_DEFAULT = "2024-11-11"
+
+# Estilos del app.py (fondo, título y columnas)
+CSS = """
+body { background-color: #1E90FF; margin: 0; font-family: "Segoe UI", sans-serif; color: white; }
+.contenedor { max-width: 1900px; margin: 0 auto; padding: 1.5rem 3rem; }
+h1 { text-transform: uppercase; margin-bottom: 0; }
+h5 { font-weight: normal; margin-top: 0; }
+.columnas { display: flex; gap: 1rem; }
+.columna { flex: 1 1 0; min-width: 0; }
+.panel { margin-bottom: 1rem; }
+.aviso { background: rgba(255, 189, 69, 0.2); color: #fffae6; padding: 1rem; border-radius: 0.5rem; }
+.pie { font-size: 0.85rem; opacity: 0.85; }
+.pie a { color: white; }
+@media (max-width: 900px) { .columnas { flex-direction: column; } }
+"""
+
+
+def _panel_html(nombre: str, figura_json: str | None, error: str | None) -> str:
+    if figura_json is None:
+        return (
+            f'<div class="panel aviso">No se pudieron cargar los datos de '
+            f"'{html.escape(nombre)}': {html.escape(error or 'sin datos')}</div>"
+        )
+    # </ dentro de un <script> cortaría el bloque
+    datos = figura_json.replace("</", "<\\/")
+    return (
+        f'<div class="panel" id="panel-{nombre}"></div>\n'
+        f'<script type="application/json" id="fig-{nombre}">{datos}</script>'
+    )
+
+
+def armar_html(paneles: dict, desde: str, hasta: str, url_app: str | None) -> str:
+    """index.html con el layout de app.py. `paneles` mapea nombre -> (figura_json, error)."""
+    columnas = "\n".join(
+        '<div class="columna">\n' + "\n".join(_panel_html(n, *paneles[n]) for n in nombres) + "\n</div>"
+        for nombres in plotting.COLUMNAS
+    )
+    enlace = ""
+    if url_app:
+        enlace = f'<p class="pie">Para otro rango de fechas: <a href="{html.escape(url_app)}">versión interactiva</a></p>'
+    generado = datetime.datetime.now().strftime("%d/%m/%Y %H:%M")
+    return f"""<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>Monitor Financiero</title>
+<style>{CSS}</style>
+<script src="plotly.min.js"></script>
+</head>
+<body>
+<div class="contenedor">
+<h1>MONITOR FINANCIERO</h1>
+<h5>indicadores monetarios, cambiarios y bursátiles &middot; {desde} a {hasta}</h5>
+<div class="columnas">
+{columnas}
+</div>
+{enlace}
+<p class="pie">Fuente de datos: Banco Central de la República Argentina (BCRA)</p>
+<p class="pie">Actualizado el {generado}</p>
+</div>
+<script>
+document.querySelectorAll('script[id^="fig-"]').forEach(function (s) {{
+  var fig = JSON.parse(s.textContent);
+  var div = document.getElementById("panel-" + s.id.slice(4));
+  Plotly.newPlot(div, fig.data, fig.layout, {{responsive: true, displaylogo: false}});
+}});
+</script>
+</body>
+</html>
+"""
+
+
+def _publicar(temporal: str, salida: str) -> None:
+    """Reemplaza `salida` por `temporal` con renames (el hueco es de microsegundos)."""
+    viejo = None
+    if os.path.exists(salida):
+        viejo = f"{salida}.viejo-{os.getpid()}"
+        os.replace(salida, viejo)
+    os.replace(temporal, salida)
+    if viejo:
+        shutil.rmtree(viejo, ignore_errors=True)
+
+
+def exportar(salida: str, desde: str, hasta: str, url_app: str | None = None, forzar: bool = False) -> bool:
+    """Descarga las fuentes, arma las figuras y publica el bundle en `salida`.
+
+    Devuelve True si todos los paneles se generaron bien.
+    """
+    resultados = descargar_en_paralelo(data_fetching.FUENTES, desde, hasta, data_fetching.TIMEOUTS_FUENTES)
+    paneles = {}
+    for nombre, plot_fn in plotting.PANELES.items():
+        res = resultados[nombre]
+        if not res.ok:
+            paneles[nombre] = (None, res.error or "sin datos")
+            continue
+        try:
+            paneles[nombre] = (plotting.figura_json(plot_fn, res.df), None)
+        except Exception as e:
+            paneles[nombre] = (None, str(e))
+    completo = all(error is None for _, error in paneles.values())
+    if not completo and not forzar and os.path.exists(os.path.join(salida, "index.html")):
+        return False
+
+    padre = os.path.dirname(os.path.abspath(salida))
+    os.makedirs(padre, exist_ok=True)
+    temporal = tempfile.mkdtemp(prefix=".export-", dir=padre)
+    try:
+        os.makedirs(os.path.join(temporal, "figuras"))
+        for nombre, (figura, _) in paneles.items():
+            if figura is not None:
+                with open(os.path.join(temporal, "figuras", f"{nombre}.json"), "w", encoding="utf-8") as f:
+                    f.write(figura)
+        with open(os.path.join(temporal, "plotly.min.js"), "w", encoding="utf-8") as f:
+            f.write(plotly.offline.get_plotlyjs())
+        with open(os.path.join(temporal, "index.html"), "w", encoding="utf-8") as f:
+            f.write(armar_html(paneles, desde, hasta, url_app))
+        with open(os.path.join(temporal, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump({
+                "desde": desde,
+                "hasta": hasta,
+                "generado": datetime.datetime.now().isoformat(timespec="seconds"),
+                "paneles": {n: {"ok": e is None, "error": e} for n, (_, e) in paneles.items()},
+            }, f, ensure_ascii=False, indent=2)
+        os.chmod(temporal, 0o755)
+        _publicar(temporal, salida)
+    except BaseException:
+        shutil.rmtree(temporal, ignore_errors=True)
+        raise
+    return completo
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--salida", default="public")
+    parser.add_argument("--desde", default=DESDE_DEFAULT)
+    parser.add_argument("--hasta", default=datetime.date.today().isoformat())
+    parser.add_argument("--url-app", default=None, help="URL de la app de Streamlit para rangos a medida")
+    parser.add_argument("--forzar", action="store_true", help="publicar aunque falle alguna fuente")
+    args = parser.parse_args()
+
+    ok = exportar(args.salida, args.desde, args.hasta, args.url_app, args.forzar)
+    print(f"Exportación {'completa' if ok else 'con errores'} en {args.salida}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+# tests/test_range_cache.py
+"""Regresiones de range_cache (correr con: python -m pytest tests)."""
+
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import range_cache
+
+
+def _serie(desde, hasta):
+    time.sleep(0.001)   # ensancha la ventana en la que la entrada está tomada
+    fechas = pd.date_range(desde, hasta, freq="D")
+    return pd.DataFrame({"fecha": fechas, "valor": np.arange(len(fechas), dtype=float)})
+
+
+def test_desalojo_con_entradas_en_uso(monkeypatch):
+    """El desalojo por presupuesto no puede soltar la serie de una entrada que otro hilo
+    está usando (antes: AttributeError 'NoneType' object has no attribute 'a_df')."""
+    monkeypatch.setattr(range_cache, "PRESUPUESTO_BYTES", 2000)
+    funciones = [range_cache.cache_por_rango("test")(_serie) for _ in range(4)]
+    errores = []
+
+    def trabajar(i):
+        try:
+            for j in range(60):
+                fn = funciones[(i + j) % len(funciones)]
+                # rangos que crecen: obliga a pedir bordes con la entrada tomada
+                df = fn(f"2024-{1 + j % 6:02d}-01", f"2024-{7 + j % 6:02d}-28")
+                assert not df.empty
+        except Exception as e:  # noqa: BLE001 - se reporta abajo
+            errores.append(repr(e))
+
+    hilos = [threading.Thread(target=trabajar, args=(i,)) for i in range(8)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    assert errores == []